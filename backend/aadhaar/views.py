@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from aadhaar.models import AadhaarDatabase
-from user_profile.models import UserProfile
+from users.cache import get_user_profile
 
 
 @api_view(["POST"])
@@ -36,7 +36,7 @@ def verify_aadhaar(request):
             status=status.HTTP_404_NOT_FOUND,
         )
 
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = get_user_profile(request.user)
 
     from user_profile.models import UserProfile as ProfileModel
     taken_by_other = ProfileModel.objects.filter(aadhaar=aadhaar).exclude(user=request.user).exists()
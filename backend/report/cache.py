@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.cache import caches
+
+COMMUNITY_FEED_GENERATION_KEY = "report:community:generation"
+
+
+def _versions():
+    # Separate alias: LocMem culling of cached pages must not reset versions.
+    return caches["versions"]
+
+
+def _get_version(key):
+    # Reads never create the key: lookups for ids that do not exist must not
+    # leave permanent entries behind. The first bump creates it.
+    return _versions().get(key, 1)
+
+
+def _bump_version(key):
+    versions = _versions()
+    try:
+        versions.incr(key)
+    except ValueError:
+        if not versions.add(key, 2, timeout=None):
+            versions.incr(key)
+
+
+def get_community_feed_generation():
+    """Current generation of the community feed."""
+    return _get_version(COMMUNITY_FEED_GENERATION_KEY)
+
+
+def bump_community_feed_generation():
+    """
+    Invalidate every cached community page at once. Old pages are never
+    deleted, they simply stop being addressed and expire on their own.
+    """
+    _bump_version(COMMUNITY_FEED_GENERATION_KEY)
+
+
+def _report_detail_version_key(tracking_id):
+    return f"report:detail:{tracking_id}:version"
+
+
+def bump_report_detail_version(tracking_id):
+    _bump_version(_report_detail_version_key(tracking_id))
+
+
+def community_page_key(cursor):
+    """
+    Key for one page of the community feed. Resolve it once per request so a
+    page computed while the generation moves on is stored under the old one.
+    """
+    generation = get_community_feed_generation()
+    return f"report:community:{generation}:page:{cursor or 'first'}"
+
+
+def community_feed_timeout():
+    return getattr(settings, "COMMUNITY_FEED_CACHE_TIMEOUT", 300)
+
+
+def report_detail_key(tracking_id):
+    version = _get_version(_report_detail_version_key(tracking_id))
+    return f"report:detail:{tracking_id}:{version}"
+
+
+def report_detail_timeout():
+    return getattr(settings, "REPORT_DETAIL_CACHE_TIMEOUT", 60)
+
+
+def daily_report_count_key(user_id, day):
+    return f"report:daily-count:{user_id}:{day.isoformat()}"
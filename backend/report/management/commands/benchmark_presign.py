@@ -0,0 +1,78 @@
+import statistics
+import time
+
+import boto3
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from report import s3
+
+
+def _boto3_presign(bucket_name, key, _client=[]):
+    """A shared botocore client, as used before local signing."""
+    if not _client:
+        _client.append(
+            boto3.client(
+                "s3",
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=getattr(settings, "AWS_REGION", "ap-south-1"),
+            )
+        )
+    return _client[0].generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket_name, "Key": key},
+        ExpiresIn=3600,
+    )
+
+
+def _legacy_presign(bucket_name, key):
+    """The original per-request path: a fresh client for every presign."""
+    client = boto3.client(
+        "s3",
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=getattr(settings, "AWS_REGION", "ap-south-1"),
+    )
+    return client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket_name, "Key": key},
+        ExpiresIn=3600,
+    )
+
+
+def _uncached_presign(bucket_name, key):
+    return s3.get_presigner().presign("GET", bucket_name, key)
+
+
+class Command(BaseCommand):
+    help = "Measure per-request latency of presigning report image GET URLs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--keys", type=int, default=6, help="Distinct image keys")
+
+    def _measure(self, label, presign, requests, keys):
+        bucket_name = settings.REPORT_IMAGES_BUCKET
+        timings = []
+        for i in range(requests):
+            started = time.perf_counter()
+            presign(bucket_name, f"reports/benchmark-{i % keys}.jpg")
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"{label:<16} mean {statistics.mean(timings):8.3f} ms   "
+            f"p50 {timings[len(timings) // 2]:8.3f} ms   "
+            f"p99 {timings[int(len(timings) * 0.99) - 1]:8.3f} ms"
+        )
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+        keys = options["keys"]
+
+        self._measure("new client", _legacy_presign, requests, keys)
+        self._measure("shared client", _boto3_presign, requests, keys)
+        self._measure("local sigv4", _uncached_presign, requests, keys)
+        s3.presigned_get_cache.clear()
+        self._measure("sigv4 + cache", s3.presigned_get_url, requests, keys)
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+from report.models import IssueReport
+from report.tracking import ALPHABET, ID_LENGTH, next_tracking_id
+from users.models import CustomUser
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_tracking_id():
+    """The previous generator: random IDs checked one query at a time."""
+    while True:
+        tid = get_random_string(ID_LENGTH, ALPHABET)
+        if not IssueReport.objects.filter(tracking_id=tid).exists():
+            return tid
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare report creation throughput of the sequence-based tracking ID "
+        "allocator against the old random-and-check loop. Runs inside a "
+        "rolled back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100_000)
+
+    def _create_reports(self, user, count, generate):
+        started = time.perf_counter()
+        for _ in range(count):
+            IssueReport.objects.create(
+                user=user,
+                location="Benchmark",
+                issue_description="Benchmark",
+                tracking_id=generate(),
+            )
+        return time.perf_counter() - started
+
+    def _run(self, label, count, generate):
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create_user(
+                    email="tracking-benchmark@example.invalid", password=None
+                )
+                elapsed = self._create_reports(user, count, generate)
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(
+            f"{label:<10} {count} reports in {elapsed:.2f}s "
+            f"({count / elapsed:,.0f} reports/s)"
+        )
+        return elapsed
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        legacy = self._run("legacy", count, legacy_tracking_id)
+        allocator = self._run("allocator", count, next_tracking_id)
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {legacy / allocator:.2f}x"))
@@ -0,0 +1,78 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from report.models import Locality
+from report_hub.gazetteer import bump_gazetteer_version
+
+REQUIRED_COLUMNS = {"name", "latitude", "longitude"}
+OPTIONAL_COLUMNS = ("ward", "city", "state", "postcode")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a ward/locality gazetteer CSV used for offline reverse geocoding. "
+        "Columns: name, latitude, longitude and optionally ward, city, state, postcode."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument(
+            "--append",
+            action="store_true",
+            help="Keep existing localities instead of replacing them",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def _parse(self, row, line_number):
+        try:
+            latitude = float(row["latitude"])
+            longitude = float(row["longitude"])
+        except (TypeError, ValueError):
+            raise CommandError(f"Line {line_number}: invalid latitude/longitude")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise CommandError(f"Line {line_number}: coordinates out of range")
+        name = (row["name"] or "").strip()
+        if not name:
+            raise CommandError(f"Line {line_number}: name is required")
+
+        return Locality(
+            name=name,
+            latitude=latitude,
+            longitude=longitude,
+            **{column: (row.get(column) or "").strip() for column in OPTIONAL_COLUMNS},
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        loaded = 0
+
+        try:
+            handle = open(options["csv_path"], newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(str(e))
+
+        with handle, transaction.atomic():
+            reader = csv.DictReader(handle)
+            missing = REQUIRED_COLUMNS - set(reader.fieldnames or [])
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+
+            if not options["append"]:
+                Locality.objects.all().delete()
+
+            batch = []
+            for line_number, row in enumerate(reader, start=2):
+                batch.append(self._parse(row, line_number))
+                if len(batch) >= batch_size:
+                    Locality.objects.bulk_create(batch)
+                    loaded += len(batch)
+                    batch = []
+            if batch:
+                Locality.objects.bulk_create(batch)
+                loaded += len(batch)
+
+            transaction.on_commit(bump_gazetteer_version)
+
+        self.stdout.write(self.style.SUCCESS(f"Loaded {loaded} localities"))
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+
+from report.models import IssueReport
+
+COUNTER_FIELDS = ("likes_count", "dislikes_count", "comments_count")
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify the denormalized like/dislike/comment counters on reports"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report drifted rows, do not write anything",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of reports recounted per query",
+        )
+
+    def handle(self, *args, **options):
+        verify_only = options["verify"]
+        batch_size = options["batch_size"]
+
+        checked = 0
+        drifted = 0
+        last_pk = 0
+
+        while True:
+            batch = list(
+                IssueReport.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .with_live_counts()
+                .only("pk", "tracking_id", *COUNTER_FIELDS)[:batch_size]
+            )
+            if not batch:
+                break
+
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            stale = []
+            for report in batch:
+                changed = False
+                for field in COUNTER_FIELDS:
+                    live_value = getattr(report, f"live_{field}")
+                    if getattr(report, field) != live_value:
+                        if verify_only:
+                            self.stdout.write(
+                                f"{report.tracking_id}: {field} "
+                                f"stored={getattr(report, field)} actual={live_value}"
+                            )
+                        setattr(report, field, live_value)
+                        changed = True
+                if changed:
+                    stale.append(report)
+
+            drifted += len(stale)
+            if stale and not verify_only:
+                IssueReport.objects.bulk_update(stale, COUNTER_FIELDS)
+
+        if verify_only:
+            self.stdout.write(
+                self.style.SUCCESS(f"Checked {checked} reports, {drifted} drifted")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Checked {checked} reports, repaired {drifted}")
+            )
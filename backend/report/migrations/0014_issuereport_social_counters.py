@@ -0,0 +1,55 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count_for_report(queryset, report_field):
+    counted = (
+        queryset.filter(**{report_field: OuterRef("pk")})
+        .order_by()
+        .values(report_field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def populate_social_counters(apps, schema_editor):
+    IssueReport = apps.get_model("report", "IssueReport")
+    Comment = apps.get_model("report", "Comment")
+
+    IssueReport.objects.update(
+        likes_count=_count_for_report(
+            IssueReport.likes.through.objects.all(), "issuereport_id"
+        ),
+        dislikes_count=_count_for_report(
+            IssueReport.dislikes.through.objects.all(), "issuereport_id"
+        ),
+        comments_count=_count_for_report(Comment.objects.all(), "report_id"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("report", "0013_issuereport_appeal_status_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issuereport",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="issuereport",
+            name="dislikes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="issuereport",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_social_counters, migrations.RunPython.noop),
+    ]
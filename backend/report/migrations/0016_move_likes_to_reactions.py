@@ -0,0 +1,90 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def _copy_m2m_rows(through, Reaction, kind):
+    last_pk = 0
+    while True:
+        rows = list(
+            through.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "issuereport_id", "customuser_id")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        Reaction.objects.bulk_create(
+            [
+                Reaction(report_id=report_id, user_id=user_id, kind=kind)
+                for _, report_id, user_id in rows
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def _copy_reactions(Reaction, through, kind):
+    last_pk = 0
+    while True:
+        rows = list(
+            Reaction.objects.filter(pk__gt=last_pk, kind=kind)
+            .order_by("pk")
+            .values_list("pk", "report_id", "user_id")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        through.objects.bulk_create(
+            [
+                through(issuereport_id=report_id, customuser_id=user_id)
+                for _, report_id, user_id in rows
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def _count_reactions(Reaction, kind):
+    counted = (
+        Reaction.objects.filter(report_id=OuterRef("pk"), kind=kind)
+        .order_by()
+        .values("report_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def move_m2m_to_reactions(apps, schema_editor):
+    IssueReport = apps.get_model("report", "IssueReport")
+    Reaction = apps.get_model("report", "Reaction")
+
+    # Likes first: a user recorded in both tables keeps the like.
+    _copy_m2m_rows(IssueReport.likes.through, Reaction, "like")
+    _copy_m2m_rows(IssueReport.dislikes.through, Reaction, "dislike")
+
+    # Dropped duplicate dislikes would otherwise leave the counters too high.
+    IssueReport.objects.update(
+        likes_count=_count_reactions(Reaction, "like"),
+        dislikes_count=_count_reactions(Reaction, "dislike"),
+    )
+
+
+def move_reactions_to_m2m(apps, schema_editor):
+    IssueReport = apps.get_model("report", "IssueReport")
+    Reaction = apps.get_model("report", "Reaction")
+
+    _copy_reactions(Reaction, IssueReport.likes.through, "like")
+    _copy_reactions(Reaction, IssueReport.dislikes.through, "dislike")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report', '0015_reaction'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_m2m_to_reactions, move_reactions_to_m2m),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report', '0016_move_likes_to_reactions'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='issuereport',
+            name='dislikes',
+        ),
+        migrations.RemoveField(
+            model_name='issuereport',
+            name='likes',
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report', '0017_remove_issuereport_likes_dislikes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackingSequence',
+            fields=[
+                ('name', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -1,6 +1,59 @@
 from django.db import models
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
+
+def _count_for_report(queryset, report_field):
+    """
+    Correlated COUNT(*) for rows of `queryset` pointing at the outer report.
+    Subqueries keep each counter independent instead of multiplying joins.
+    """
+    counted = (
+        queryset.filter(**{report_field: OuterRef("pk")})
+        .order_by()
+        .values(report_field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+class IssueReportQuerySet(models.QuerySet):
+    def with_social_context(self, viewer=None):
+        """
+        Load what IssueReportSerializer needs for the viewer's reaction flags
+        so that a page renders with a constant number of queries.
+        """
+        queryset = self.select_related("user")
+
+        if viewer is not None and viewer.is_authenticated:
+            viewer_reactions = Reaction.objects.filter(
+                report_id=OuterRef("pk"), user_id=viewer.pk
+            )
+            return queryset.annotate(
+                is_liked=Exists(viewer_reactions.filter(kind=Reaction.LIKE)),
+                is_disliked=Exists(viewer_reactions.filter(kind=Reaction.DISLIKE)),
+            )
+
+        return queryset.annotate(is_liked=Value(False), is_disliked=Value(False))
+
+    def with_live_counts(self):
+        """
+        Annotate counters recomputed from the underlying tables, used to
+        rebuild or verify the denormalized *_count columns.
+        """
+        return self.annotate(
+            live_likes_count=_count_for_report(
+                Reaction.objects.filter(kind=Reaction.LIKE), "report_id"
+            ),
+            live_dislikes_count=_count_for_report(
+                Reaction.objects.filter(kind=Reaction.DISLIKE), "report_id"
+            ),
+            live_comments_count=_count_for_report(Comment.objects.all(), "report_id"),
+        )
+
+
 class IssueReport(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -44,8 +97,11 @@ class IssueReport(models.Model):
     trust_score_delta = models.IntegerField(default=0)
     
     # Social Features
-    likes = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='liked_reports', blank=True)
-    dislikes = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='disliked_reports', blank=True)
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    objects = IssueReportQuerySet.as_manager()
     
     class Meta:
         ordering = ["-issue_date"]
@@ -53,6 +109,39 @@ class IssueReport(models.Model):
     def __str__(self):
         return f"{self.tracking_id} @ {self.location} - {self.get_status_display()}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so signals can detect transitions.
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+class Reaction(models.Model):
+    LIKE = "like"
+    DISLIKE = "dislike"
+    KIND_CHOICES = [
+        (LIKE, "Like"),
+        (DISLIKE, "Dislike"),
+    ]
+
+    report = models.ForeignKey(IssueReport, on_delete=models.CASCADE, related_name='reactions')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_reactions')
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["report", "user"], name="unique_reaction_per_user"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.kind}s {self.report.tracking_id}"
+
+    @staticmethod
+    def counter_field(kind):
+        return f"{kind}s_count"
+
+
 class Comment(models.Model):
     report = models.ForeignKey(IssueReport, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -64,3 +153,26 @@ class Comment(models.Model):
 
     def __str__(self):
         return f"Comment by {self.user} on {self.report.tracking_id}"
+
+
+class TrackingSequence(models.Model):
+    """Named counter backing report.tracking.TrackingIdAllocator"""
+    name = models.CharField(max_length=30, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
+
+class Locality(models.Model):
+    """Gazetteer entry used to answer reverse geocoding without Nominatim"""
+    name = models.CharField(max_length=200)
+    ward = models.CharField(max_length=200, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    postcode = models.CharField(max_length=10, blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    def __str__(self):
+        return f"{self.name}, {self.city}"
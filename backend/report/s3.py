@@ -0,0 +1,113 @@
+"""
+Shared S3 access for report images.
+
+URLs are presigned locally with report.sigv4. Static keys from settings
+are used when configured; otherwise credentials come from boto3's default
+chain (environment, instance role, ...), refreshed as they rotate. One
+presigner is created lazily per process, and presigned GET URLs are cached
+per object key and handed out again until shortly before they expire (or
+before the temporary credentials that signed them do).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .sigv4 import S3Presigner, StaticCredentials
+
+PRESIGN_EXPIRES_IN = 3600  # 1 hour
+PRESIGN_REFRESH_MARGIN = 300  # stop reusing a URL 5 minutes before expiry
+PRESIGN_CACHE_SIZE = 10_000
+
+_presigner = None
+_presigner_lock = threading.Lock()
+
+
+def _credentials():
+    access_key = getattr(settings, "AWS_ACCESS_KEY_ID", None)
+    secret_key = getattr(settings, "AWS_SECRET_ACCESS_KEY", None)
+    if access_key and secret_key:
+        return StaticCredentials(
+            access_key, secret_key, getattr(settings, "AWS_SESSION_TOKEN", None)
+        )
+
+    import boto3
+
+    credentials = boto3.Session().get_credentials()
+    if credentials is None:
+        raise ValueError("AWS credentials are not configured")
+    return credentials
+
+
+def get_presigner():
+    global _presigner
+    if _presigner is None:
+        with _presigner_lock:
+            if _presigner is None:
+                _presigner = S3Presigner(
+                    _credentials(), getattr(settings, "AWS_REGION", "ap-south-1")
+                )
+    return _presigner
+
+
+class PresignedUrlCache:
+    """Thread-safe LRU of presigned URLs with their expiry time."""
+
+    def __init__(self, max_size=PRESIGN_CACHE_SIZE, refresh_margin=PRESIGN_REFRESH_MARGIN):
+        self.max_size = max_size
+        self.refresh_margin = refresh_margin
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cache_key):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            url, expires_at = entry
+            if time.time() >= expires_at - self.refresh_margin:
+                del self._entries[cache_key]
+                return None
+            self._entries.move_to_end(cache_key)
+            return url
+
+    def set(self, cache_key, url, expires_at):
+        with self._lock:
+            self._entries[cache_key] = (url, expires_at)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+presigned_get_cache = PresignedUrlCache()
+
+
+def presigned_get_url(bucket_name, key):
+    cache_key = (bucket_name, key)
+    url = presigned_get_cache.get(cache_key)
+    if url is None:
+        presigner = get_presigner()
+        expires_at = time.time() + PRESIGN_EXPIRES_IN
+        url = presigner.presign("GET", bucket_name, key, expires_in=PRESIGN_EXPIRES_IN)
+        # A URL stops working when the temporary credentials behind it expire.
+        credentials_expiry = presigner.credentials_expiry()
+        if credentials_expiry is not None:
+            expires_at = min(expires_at, credentials_expiry.timestamp())
+        presigned_get_cache.set(cache_key, url, expires_at)
+    return url
+
+
+def presigned_put_url(bucket_name, key, content_type):
+    return get_presigner().presign(
+        "PUT",
+        bucket_name,
+        key,
+        expires_in=PRESIGN_EXPIRES_IN,
+        headers={"Content-Type": content_type},
+    )
@@ -1,6 +1,9 @@
-from django.utils.crypto import get_random_string
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from .models import IssueReport, Comment
+from .models import IssueReport, Comment, Reaction
+from .tracking import next_tracking_id
+
+TRACKING_ID_ATTEMPTS = 3
 
 class CommentSerializer(serializers.ModelSerializer):
     """
@@ -54,9 +57,6 @@ class IssueReportSerializer(serializers.ModelSerializer):
     """
     user_name = serializers.SerializerMethodField()
     username = serializers.SerializerMethodField()
-    likes_count = serializers.IntegerField(source='likes.count', read_only=True)
-    dislikes_count = serializers.IntegerField(source='dislikes.count', read_only=True)
-    comments_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     is_disliked = serializers.SerializerMethodField()
 
@@ -65,7 +65,7 @@ class IssueReportSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = (
             "id", "issue_date", "updated_at", "status", "user", 
-            "tracking_id", "likes", "dislikes", "user_name", "username",
+            "tracking_id", "user_name", "username",
             "likes_count", "dislikes_count", "comments_count",
             "appeal_status", "trust_score_delta"
         )
@@ -107,40 +107,42 @@ class IssueReportSerializer(serializers.ModelSerializer):
         """Get username"""
         return obj.user.username if hasattr(obj.user, 'username') else obj.user.email
 
-    def get_comments_count(self, obj):
-        """Get the count of comments for this issue"""
-        return obj.comments.count()
-
     def get_is_liked(self, obj):
         """Check if the current user has liked this post"""
+        if hasattr(obj, 'is_liked'):
+            return obj.is_liked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.likes.filter(id=request.user.id).exists()
+            return obj.reactions.filter(user=request.user, kind=Reaction.LIKE).exists()
         return False
 
     def get_is_disliked(self, obj):
         """Check if the current user has disliked this post"""
+        if hasattr(obj, 'is_disliked'):
+            return obj.is_disliked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.dislikes.filter(id=request.user.id).exists()
+            return obj.reactions.filter(user=request.user, kind=Reaction.DISLIKE).exists()
         return False
 
-    def _generate_unique_tracking_id(self) -> str:
-        allowed_chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-        while True:
-            tid = get_random_string(8, allowed_chars)
-            if not IssueReport.objects.filter(tracking_id=tid).exists():
-                return tid
-
     def create(self, validated_data):
         request = self.context.get("request")
         if request and getattr(request, "user", None) and request.user.is_authenticated:
             validated_data.setdefault("user", request.user)
 
-        if not validated_data.get("tracking_id"):
-            validated_data["tracking_id"] = self._generate_unique_tracking_id()
-
-        return super().create(validated_data)
+        if validated_data.get("tracking_id"):
+            return super().create(validated_data)
+
+        for attempt in range(TRACKING_ID_ATTEMPTS):
+            validated_data["tracking_id"] = next_tracking_id()
+            try:
+                with transaction.atomic():
+                    return super().create(validated_data)
+            except IntegrityError:
+                # Allocated IDs never repeat, but may hit one issued by the
+                # old random generator; move on to the next sequence number.
+                if attempt == TRACKING_ID_ATTEMPTS - 1:
+                    raise
     
     def validate_image_url(self, value):
         if value and value.startswith("http"):
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.services import refresh_resolution_incentive
+
+from .cache import bump_community_feed_generation, bump_report_detail_version
+from .models import IssueReport
+
+
+def _invalidate(tracking_id, feed):
+    bump_report_detail_version(tracking_id)
+    if feed:
+        bump_community_feed_generation()
+
+
+def _invalidate_now_and_on_commit(tracking_id, feed=False):
+    _invalidate(tracking_id, feed)
+    # Bump again once committed, in case a request cached a page built
+    # from the old row between the save and the commit.
+    transaction.on_commit(lambda: _invalidate(tracking_id, feed))
+
+
+def _refresh_incentive_on_commit(user_id):
+    transaction.on_commit(lambda: refresh_resolution_incentive(user_id))
+
+
+# Registered before invalidate_feed_on_status_change, which resets
+# _loaded_status after reading it.
+@receiver(post_save, sender=IssueReport)
+def refresh_incentive_on_status_change(sender, instance, created, **kwargs):
+    if created or getattr(instance, "_loaded_status", None) != instance.status:
+        _refresh_incentive_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=IssueReport)
+def invalidate_feed_on_status_change(sender, instance, created, **kwargs):
+    was_resolved = getattr(instance, "_loaded_status", None) == "resolved"
+    is_resolved = instance.status == "resolved"
+
+    # Any save of a resolved report may change what the feed shows.
+    _invalidate_now_and_on_commit(instance.tracking_id, feed=was_resolved or is_resolved)
+
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=IssueReport)
+def invalidate_feed_on_delete(sender, instance, **kwargs):
+    _refresh_incentive_on_commit(instance.user_id)
+    _invalidate_now_and_on_commit(instance.tracking_id, feed=instance.status == "resolved")
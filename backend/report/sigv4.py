@@ -0,0 +1,126 @@
+"""
+Minimal AWS Signature Version 4 query-string signer for S3 presigned URLs.
+
+Presigning only needs a few HMAC-SHA256 computations, so going through
+botocore's request pipeline (and importing boto3 in every web worker) is
+unnecessary. URLs match what botocore's generate_presigned_url produces for
+the same bucket, key, time and credentials.
+
+Credentials come from a provider with botocore's get_frozen_credentials()
+interface, read on every signing, so refreshable (e.g. instance-role)
+credentials keep working after they rotate.
+"""
+
+import hashlib
+import hmac
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import quote
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+_DNS_COMPATIBLE_BUCKET = re.compile(r"^[a-z0-9][a-z0-9\-]{1,61}[a-z0-9]$")
+
+
+def _hmac(key, msg):
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+@lru_cache(maxsize=32)
+def signing_key(secret_key, date_stamp, region, service):
+    """Derived signing key; it only changes once per day per region."""
+    k_date = _hmac(f"AWS4{secret_key}".encode("utf-8"), date_stamp)
+    k_region = _hmac(k_date, region)
+    k_service = _hmac(k_region, service)
+    return _hmac(k_service, "aws4_request")
+
+
+def _encode(value, safe="-_.~"):
+    return quote(value, safe=safe)
+
+
+class StaticCredentials:
+    """Fixed keys from settings, shaped like botocore's frozen credentials."""
+
+    def __init__(self, access_key, secret_key, token=None):
+        if not access_key or not secret_key:
+            raise ValueError("AWS credentials are not configured")
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.token = token
+
+    def get_frozen_credentials(self):
+        return self
+
+
+class S3Presigner:
+    def __init__(self, credentials, region):
+        self.credentials = credentials
+        self.region = region
+
+    def credentials_expiry(self):
+        """Expiry of temporary credentials (botocore RefreshableCredentials), else None."""
+        return getattr(self.credentials, "_expiry_time", None)
+
+    def _host_and_path(self, bucket, key):
+        encoded_key = _encode(key, safe="/~")
+        if _DNS_COMPATIBLE_BUCKET.match(bucket):
+            return f"{bucket}.s3.amazonaws.com", f"/{encoded_key}"
+        return f"s3.{self.region}.amazonaws.com", f"/{bucket}/{encoded_key}"
+
+    def presign(self, method, bucket, key, expires_in=3600, headers=None, now=None):
+        """
+        Return a presigned URL for `method` on s3://bucket/key. Extra
+        `headers` (e.g. Content-Type for uploads) are signed and must be
+        sent unchanged by the client.
+        """
+        now = now or datetime.now(timezone.utc)
+        credentials = self.credentials.get_frozen_credentials()
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = now.strftime("%Y%m%d")
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+
+        host, path = self._host_and_path(bucket, key)
+        signed = {"host": host}
+        for name, value in (headers or {}).items():
+            signed[name.lower()] = " ".join(str(value).split())
+        signed_names = sorted(signed)
+        signed_headers = ";".join(signed_names)
+
+        params = {
+            "X-Amz-Algorithm": ALGORITHM,
+            "X-Amz-Credential": f"{credentials.access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": signed_headers,
+        }
+        if credentials.token:
+            params["X-Amz-Security-Token"] = credentials.token
+
+        canonical_query = "&".join(
+            f"{_encode(name)}={_encode(value)}" for name, value in sorted(params.items())
+        )
+        canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in signed_names)
+        canonical_request = "\n".join([
+            method,
+            path,
+            canonical_query,
+            canonical_headers,
+            signed_headers,
+            UNSIGNED_PAYLOAD,
+        ])
+        string_to_sign = "\n".join([
+            ALGORITHM,
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ])
+        signature = hmac.new(
+            signing_key(credentials.secret_key, date_stamp, self.region, "s3"),
+            string_to_sign.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+        return f"https://{host}{path}?{canonical_query}&X-Amz-Signature={signature}"
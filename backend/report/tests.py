@@ -1,3 +1,639 @@
-from django.test import TestCase
+import threading
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from urllib.parse import parse_qs, urlparse
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from aadhaar.models import AadhaarDatabase
+from user_profile.models import UserProfile
+from users.models import CustomUser
+from . import s3, tracking
+from .cache import (
+    bump_community_feed_generation,
+    bump_report_detail_version,
+    community_page_key,
+    get_community_feed_generation,
+    report_detail_key,
+    _report_detail_version_key,
+)
+from .models import IssueReport, Comment, Reaction, TrackingSequence
+from .serializers import IssueReportSerializer
+from .sigv4 import S3Presigner, StaticCredentials
+from .tracking import ALPHABET, ID_SPACE, FeistelPermutation, TrackingIdAllocator
+from .views import get_daily_report_limit_status, reserve_daily_report_slot
+
+
+def create_report(user, index, status="pending"):
+    return IssueReport.objects.create(
+        user=user,
+        issue_title=f"Issue {index}",
+        location="MG Road",
+        issue_description="Pothole",
+        status=status,
+        tracking_id=f"TRK{index:05d}",
+    )
+
+
+class IssueReportQueryCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = CustomUser.objects.create_user(
+            email="viewer@example.com", password="pass12345"
+        )
+        self.author = CustomUser.objects.create_user(
+            email="author@example.com", password="pass12345"
+        )
+        self.next_index = 0
+
+    def add_reports(self, count, status="pending"):
+        for _ in range(count):
+            report = create_report(self.author, self.next_index, status=status)
+            self.next_index += 1
+            Reaction.objects.create(report=report, user=self.viewer, kind=Reaction.LIKE)
+            Reaction.objects.create(report=report, user=self.author, kind=Reaction.DISLIKE)
+            Comment.objects.create(report=report, user=self.author, text="Same here")
+        call_command("rebuild_report_counters", stdout=StringIO())
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_list_query_count_is_constant(self):
+        self.client.force_authenticate(self.viewer)
+
+        self.add_reports(2)
+        small, _ = self.count_queries("/api/reports/")
+        self.add_reports(10)
+        large, response = self.count_queries("/api/reports/")
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data), 12)
+        first = response.data[0]
+        self.assertEqual(first["likes_count"], 1)
+        self.assertEqual(first["dislikes_count"], 1)
+        self.assertEqual(first["comments_count"], 1)
+        self.assertTrue(first["is_liked"])
+        self.assertFalse(first["is_disliked"])
+        self.assertEqual(first["username"], "author")
+
+    def test_community_page_query_count_is_constant(self):
+        self.add_reports(1, status="resolved")
+        small, _ = self.count_queries("/api/reports/community/resolved/")
+        self.add_reports(10, status="resolved")
+        full, response = self.count_queries("/api/reports/community/resolved/")
+
+        self.assertEqual(small, full)
+        self.assertEqual(len(response.data["results"]), 6)
+        self.assertFalse(response.data["results"][0]["is_liked"])
+
+    def test_public_detail_uses_annotations(self):
+        self.add_reports(1)
+        queries, response = self.count_queries("/track/detail/TRK00000/")
+
+        self.assertEqual(queries, 1)
+        self.assertEqual(response.data["comments_count"], 1)
+
+
+class SocialCounterTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="fan@example.com", password="pass12345"
+        )
+        self.report = create_report(self.user, 1, status="resolved")
+        self.client.force_authenticate(self.user)
+
+    def test_toggle_views_maintain_counters(self):
+        url = f"/api/reports/{self.report.id}/"
+
+        response = self.client.post(url + "like/")
+        self.assertEqual(response.data, {"liked": True, "likes_count": 1, "dislikes_count": 0})
+
+        response = self.client.post(url + "dislike/")
+        self.assertEqual(
+            response.data, {"disliked": True, "likes_count": 0, "dislikes_count": 1}
+        )
+
+        response = self.client.post(url + "dislike/")
+        self.assertEqual(
+            response.data, {"disliked": False, "likes_count": 0, "dislikes_count": 0}
+        )
+
+    def test_react_endpoint_toggles_and_switches(self):
+        url = f"/api/reports/{self.report.id}/react/"
+
+        response = self.client.post(url, {"kind": "like"})
+        self.assertEqual(response.data["active"], True)
+        self.assertEqual(response.data["likes_count"], 1)
+
+        response = self.client.post(url, {"kind": "dislike"})
+        self.assertEqual(response.data["likes_count"], 0)
+        self.assertEqual(response.data["dislikes_count"], 1)
+        self.assertEqual(Reaction.objects.get().kind, Reaction.DISLIKE)
+
+        response = self.client.post(url, {"kind": "dislike"})
+        self.assertEqual(response.data["active"], False)
+        self.assertFalse(Reaction.objects.exists())
+
+    def test_react_endpoint_rejects_unknown_kind_and_report(self):
+        response = self.client.post(f"/api/reports/{self.report.id}/react/", {"kind": "love"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post("/api/reports/999999/react/", {"kind": "like"})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Reaction.objects.exists())
+
+    def test_comment_create_increments_counter(self):
+        self.client.post(f"/api/reports/{self.report.id}/comments/", {"text": "Fixed!"})
+
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.comments_count, 1)
+
+    def test_rebuild_command_repairs_drift(self):
+        Reaction.objects.create(report=self.report, user=self.user, kind=Reaction.LIKE)
+        Comment.objects.create(report=self.report, user=self.user, text="Thanks")
+
+        out = StringIO()
+        call_command("rebuild_report_counters", "--verify", stdout=out)
+        self.assertIn("1 drifted", out.getvalue())
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.likes_count, 0)
+
+        call_command("rebuild_report_counters", stdout=StringIO())
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.likes_count, 1)
+        self.assertEqual(self.report.comments_count, 1)
+
+
+class CommunityFeedCacheTests(APITestCase):
+    url = "/api/reports/community/resolved/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="citizen@example.com", password="pass12345"
+        )
+        self.report = create_report(self.user, 1, status="resolved")
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_status_transitions_invalidate_feed(self):
+        self.client.get(self.url)
+
+        other = create_report(self.user, 2)
+        other.status = "resolved"
+        other.save()
+        self.assertEqual(len(self.client.get(self.url).data["results"]), 2)
+
+        self.report.status = "closed"
+        self.report.save()
+        self.assertEqual(len(self.client.get(self.url).data["results"]), 1)
+
+    def test_counter_changes_invalidate_feed(self):
+        self.client.get(self.url)
+
+        self.client.force_authenticate(self.user)
+        self.client.post(f"/api/reports/{self.report.id}/react/", {"kind": "like"})
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.client.get(self.url).data["results"][0]["likes_count"], 1)
+
+    def test_unrelated_reports_keep_cache(self):
+        self.client.get(self.url)
+        create_report(self.user, 2)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_page_cached_before_commit_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report.status = "closed"
+            self.report.save()
+            # Stand-in for a concurrent reader caching the old page
+            # between the save and the commit.
+            cache.set(community_page_key(None), "stale", timeout=300)
+
+        self.assertNotEqual(cache.get(community_page_key(None)), "stale")
+
+    def test_culling_the_default_cache_keeps_versions(self):
+        bump_community_feed_generation()
+        generation = get_community_feed_generation()
+
+        for n in range(1000):
+            cache.set(f"filler:{n}", n)
+
+        self.assertEqual(get_community_feed_generation(), generation)
+
+
+class PublicDetailCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="walker@example.com", password="pass12345"
+        )
+        self.report = create_report(self.user, 1)
+        self.url = f"/track/detail/{self.report.tracking_id}/"
+
+    def test_anonymous_detail_is_cached_until_report_changes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.report.status = "in_progress"
+        self.report.save()
+        self.assertEqual(self.client.get(self.url).data["status"], "in_progress")
+
+    def test_missing_report_is_not_cached(self):
+        self.assertEqual(self.client.get("/track/detail/NOPE0000/").status_code, 404)
+        self.assertEqual(self.client.get("/track/detail/NOPE0000/").status_code, 404)
+
+    def test_unknown_ids_leave_no_version_keys(self):
+        self.client.get("/track/detail/NOPE0001/")
+
+        self.assertIsNone(caches["versions"].get(_report_detail_version_key("NOPE0001")))
+
+    def test_first_bump_changes_the_key(self):
+        key = report_detail_key(self.report.tracking_id)
+        bump_report_detail_version(self.report.tracking_id)
+
+        self.assertNotEqual(report_detail_key(self.report.tracking_id), key)
+
+
+@override_settings(DAILY_REPORT_LIMIT_CACHE=True)
+class DailyReportLimitTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="busy@example.com", password="pass12345"
+        )
+
+    def test_eligibility_counter_is_rebuilt_once_from_db(self):
+        create_report(self.user, 1)
+        self.client.force_authenticate(self.user)
+
+        self.assertEqual(self.client.get("/api/reports/eligibility/").data["count"], 1)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/reports/eligibility/")
+        self.assertTrue(response.data["can_submit"])
+
+    def test_reservations_stop_at_limit(self):
+        create_report(self.user, 1)
+
+        granted = [reserve_daily_report_slot(self.user)[1] is not None for _ in range(5)]
+
+        self.assertEqual(granted, [True, True, True, False, False])
+        self.assertFalse(get_daily_report_limit_status(self.user)["can_submit"])
+        self.assertEqual(get_daily_report_limit_status(self.user)["count"], 4)
+
+    def test_concurrent_reservations_cannot_exceed_limit(self):
+        get_daily_report_limit_status(self.user)
+        barrier = threading.Barrier(10)
+        granted = []
+
+        def submit():
+            barrier.wait()
+            granted.append(reserve_daily_report_slot(self.user)[1] is not None)
+
+        threads = [threading.Thread(target=submit) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(granted.count(True), 4)
+        self.assertEqual(get_daily_report_limit_status(self.user)["count"], 4)
+
+
+@override_settings(DAILY_REPORT_LIMIT_CACHE=False)
+class DatabaseDailyReportLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="busy@example.com", password="pass12345"
+        )
+
+    def test_limit_is_counted_from_db_without_cache_counter(self):
+        for index in range(3):
+            create_report(self.user, index)
+
+        status, key = reserve_daily_report_slot(self.user)
+        self.assertTrue(status["can_submit"])
+        self.assertIsNone(key)
+
+        create_report(self.user, 3)
+        # Another worker's LocMem counter cannot hide reports from the DB count.
+        cache.clear()
+        self.assertFalse(reserve_daily_report_slot(self.user)[0]["can_submit"])
+        self.assertEqual(get_daily_report_limit_status(self.user)["count"], 4)
+
+
+class TrackingIdPermutationTests(SimpleTestCase):
+    def test_permutation_is_injective_and_in_range(self):
+        permutation = FeistelPermutation(b"test-key")
+        values = [permutation.permute(n) for n in range(20_000)]
+
+        self.assertEqual(len(set(values)), len(values))
+        self.assertTrue(all(0 <= value < ID_SPACE for value in values))
+        self.assertEqual(permutation.permute(ID_SPACE - 1) < ID_SPACE, True)
+
+    def test_sequential_numbers_do_not_look_sequential(self):
+        permutation = FeistelPermutation(b"test-key")
+
+        self.assertGreater(abs(permutation.permute(1) - permutation.permute(2)), 1000)
+
+    def test_different_keys_give_different_ids(self):
+        self.assertNotEqual(
+            FeistelPermutation(b"a").permute(7), FeistelPermutation(b"b").permute(7)
+        )
+
+
+class TrackingIdAllocatorTests(TestCase):
+    def test_ids_are_unique_and_reserve_sequence_in_blocks(self):
+        allocator = TrackingIdAllocator(b"test-key", block_size=50)
+
+        with CaptureQueriesContext(connection) as ctx:
+            ids = [allocator.next_id() for _ in range(120)]
+
+        self.assertEqual(len(set(ids)), 120)
+        self.assertTrue(all(len(tid) == 8 and set(tid) <= set(ALPHABET) for tid in ids))
+        writes = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(writes), 3)
+
+    def test_serializer_skips_ids_taken_by_old_generator(self):
+        user = CustomUser.objects.create_user(email="old@example.com", password="pass12345")
+        create_report(user, 1)
+
+        serializer = IssueReportSerializer(
+            data={"location": "MG Road", "issue_description": "Pothole"}
+        )
+        serializer.is_valid(raise_exception=True)
+        with mock.patch(
+            "report.serializers.next_tracking_id", side_effect=["TRK00001", "FRESH001"]
+        ):
+            report = serializer.save(user=user)
+
+        self.assertEqual(report.tracking_id, "FRESH001")
+        self.assertEqual(IssueReport.objects.count(), 2)
+
+
+@override_settings(TRACKING_ID_BLOCK_SIZE=10)
+class TrackingIdRollbackTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        tracking._allocator = None
+        self.addCleanup(setattr, tracking, "_allocator", None)
+        self.user = CustomUser.objects.create_user(
+            email="reporter@example.com", password="pass12345"
+        )
+        aadhaar = AadhaarDatabase.objects.create(
+            aadhaar_number="123412341234",
+            full_name="Reporter",
+            date_of_birth="1990-01-01",
+            address="MG Road",
+            gender="F",
+        )
+        UserProfile.objects.create(user=self.user, aadhaar=aadhaar, is_aadhaar_verified=True)
+        self.client.force_authenticate(self.user)
+
+    def post_report(self):
+        return self.client.post(
+            "/api/reports/", {"location": "MG Road", "issue_description": "Pothole"}
+        )
+
+    def test_reservation_refuses_to_join_an_outer_transaction(self):
+        allocator = TrackingIdAllocator(b"test-key", block_size=10)
+
+        with transaction.atomic(), self.assertRaises(RuntimeError):
+            allocator.next_id()
+
+    def test_block_survives_a_rolled_back_create(self):
+        for index in range(4):
+            create_report(self.user, index)
+
+        self.assertEqual(self.post_report().status_code, 400)
+
+        # The rejected create rolled back, but its block stays reserved, so
+        # another worker starts after it instead of reissuing the same IDs.
+        other_worker = TrackingIdAllocator(b"test-key", block_size=10)
+        self.assertEqual(other_worker.next_sequence(), 10)
+        self.assertEqual(TrackingSequence.objects.get().next_value, 20)
+
+    def test_create_uses_the_allocator(self):
+        response = self.post_report()
+
+        self.assertEqual(response.status_code, 201)
+        report = IssueReport.objects.get()
+        self.assertEqual(report.tracking_id, tracking.encode(
+            tracking.get_tracking_id_allocator().permutation.permute(0)
+        ))
+
+
+@override_settings(
+    REPORT_IMAGES_BUCKET="reportmitra-test",
+    AWS_ACCESS_KEY_ID="AKIDEXAMPLE",
+    AWS_SECRET_ACCESS_KEY="wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",
+)
+class PresignTests(APITestCase):
+    def setUp(self):
+        s3._presigner = None
+        s3.presigned_get_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="uploader@example.com", password="pass12345"
+        )
+        self.report = create_report(self.user, 1, status="resolved")
+        self.report.image_url = "reports/before.jpg"
+        self.report.completion_url = "reports/after.jpg"
+        self.report.save()
+
+    def tearDown(self):
+        s3._presigner = None
+        s3.presigned_get_cache.clear()
+
+    def test_get_urls_are_reused(self):
+        first = self.client.get(f"/api/reports/{self.report.id}/presign-get/").data
+        with mock.patch.object(s3.get_presigner(), "presign") as presign:
+            second = self.client.get(f"/api/reports/{self.report.id}/presign-get/").data
+
+        presign.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertIn("reports/before.jpg", first["before"])
+        self.assertIn("reports/after.jpg", first["after"])
+
+    def test_urls_close_to_expiry_are_regenerated(self):
+        url = s3.presigned_get_url("reportmitra-test", "reports/before.jpg")
+        s3.presigned_get_cache.set(("reportmitra-test", "reports/before.jpg"), url, 0)
+
+        with mock.patch.object(s3.get_presigner(), "presign") as presign:
+            presign.return_value = "https://fresh"
+            self.assertEqual(
+                s3.presigned_get_url("reportmitra-test", "reports/before.jpg"), "https://fresh"
+            )
+
+    def test_upload_url(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            "/api/reports/s3/presign/", {"fileName": "a.jpg", "contentType": "image/jpeg"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response.data["key"], response.data["url"])
+
+    def test_batch_presign_uses_one_lookup_and_keeps_order(self):
+        other = create_report(self.user, 2)
+
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                "/api/reports/presign-get/batch/",
+                {"ids": [other.id, 999999, self.report.id]},
+                format="json",
+            )
+
+        results = response.data["results"]
+        self.assertEqual([item.get("id") for item in results], [other.id, 999999, self.report.id])
+        self.assertIsNone(results[0]["before"])
+        self.assertEqual(results[1]["detail"], "Report not found")
+        self.assertIn("reports/after.jpg", results[2]["after"])
+
+    def test_batch_presign_by_tracking_id_and_limits(self):
+        response = self.client.post(
+            "/api/reports/presign-get/batch/",
+            {"tracking_ids": [self.report.tracking_id]},
+            format="json",
+        )
+        self.assertEqual(response.data["results"][0]["id"], self.report.id)
+
+        response = self.client.post(
+            "/api/reports/presign-get/batch/", {"ids": list(range(51))}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            "/api/reports/presign-get/batch/",
+            {"tracking_ids": [self.report.tracking_id, ["nested"]]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_community_feed_can_inline_images(self):
+        cache.clear()
+        plain = self.client.get("/api/reports/community/resolved/").data["results"][0]
+        inlined = self.client.get(
+            "/api/reports/community/resolved/?include_images=1"
+        ).data["results"][0]
+
+        self.assertNotIn("images", plain)
+        self.assertIn("reports/before.jpg", inlined["images"]["before"])
+
+    def test_cached_community_page_is_presigned_on_each_read(self):
+        cache.clear()
+        url = "/api/reports/community/resolved/?include_images=1"
+        self.client.get(url)
+        s3.presigned_get_cache.clear()
+
+        with mock.patch.object(s3.get_presigner(), "presign") as presign:
+            presign.return_value = "https://fresh"
+            item = self.client.get(url).data["results"][0]
+
+        self.assertEqual(item["images"]["before"], "https://fresh")
+
+
+class SigV4PresignerTests(SimpleTestCase):
+    access_key = "AKIDEXAMPLE"
+    secret_key = "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY"
+
+    def assert_matches_botocore(self, method, operation, bucket, key, headers=None, **params):
+        import boto3
+
+        client = boto3.client(
+            "s3",
+            aws_access_key_id=self.access_key,
+            aws_secret_access_key=self.secret_key,
+            region_name="ap-south-1",
+        )
+        expected = client.generate_presigned_url(
+            operation, Params={"Bucket": bucket, "Key": key, **params}, ExpiresIn=900
+        )
+        amz_date = parse_qs(urlparse(expected).query)["X-Amz-Date"][0]
+        now = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+
+        presigner = S3Presigner(StaticCredentials(self.access_key, self.secret_key), "ap-south-1")
+        self.assertEqual(
+            presigner.presign(method, bucket, key, expires_in=900, headers=headers, now=now),
+            expected,
+        )
+
+    def test_get_matches_botocore(self):
+        self.assert_matches_botocore("GET", "get_object", "reportmitra", "reports/a b+c~é.jpg")
+
+    def test_put_with_content_type_matches_botocore(self):
+        self.assert_matches_botocore(
+            "PUT",
+            "put_object",
+            "reportmitra",
+            "reports/abc-photo.png",
+            headers={"Content-Type": "image/png"},
+            ContentType="image/png",
+        )
+
+    def test_path_style_bucket_matches_botocore(self):
+        self.assert_matches_botocore("GET", "get_object", "report.mitra", "reports/x.jpg")
+
+    def test_missing_credentials_are_rejected(self):
+        with self.assertRaises(ValueError):
+            StaticCredentials(None, None)
+
+
+@override_settings(AWS_ACCESS_KEY_ID=None, AWS_SECRET_ACCESS_KEY=None)
+class DefaultCredentialChainTests(SimpleTestCase):
+    def setUp(self):
+        s3._presigner = None
+        s3.presigned_get_cache.clear()
+        self.addCleanup(setattr, s3, "_presigner", None)
+        self.addCleanup(s3.presigned_get_cache.clear)
+
+    def role_credentials(self, *keys, expiry=None):
+        credentials = mock.Mock(_expiry_time=expiry)
+        credentials.get_frozen_credentials.side_effect = [
+            mock.Mock(access_key=access_key, secret_key="secret", token="session")
+            for access_key in keys
+        ]
+        return credentials
+
+    def test_rotated_role_credentials_are_used_for_each_signature(self):
+        credentials = self.role_credentials("ASIAFIRST", "ASIASECOND")
+        with mock.patch("boto3.Session") as session:
+            session.return_value.get_credentials.return_value = credentials
+            first = s3.presigned_put_url("bucket", "a.jpg", "image/jpeg")
+            second = s3.presigned_put_url("bucket", "a.jpg", "image/jpeg")
+
+        self.assertIn("ASIAFIRST", first)
+        self.assertIn("ASIASECOND", second)
+        self.assertIn("X-Amz-Security-Token=session", second)
+
+    def test_cached_url_does_not_outlive_credentials(self):
+        soon = datetime.now(timezone.utc) + timedelta(minutes=4)
+        credentials = self.role_credentials("ASIAFIRST", "ASIASECOND", expiry=soon)
+        with mock.patch("boto3.Session") as session:
+            session.return_value.get_credentials.return_value = credentials
+            first = s3.presigned_get_url("bucket", "a.jpg")
+            second = s3.presigned_get_url("bucket", "a.jpg")
+
+        self.assertNotEqual(first, second)
+
+    def test_no_credentials_anywhere(self):
+        with mock.patch("boto3.Session") as session:
+            session.return_value.get_credentials.return_value = None
+            with self.assertRaises(ValueError):
+                s3.get_presigner()
@@ -0,0 +1,130 @@
+"""
+Tracking ID allocation.
+
+IDs are produced by pushing a monotonically increasing sequence number
+through a keyed Feistel permutation of the 36^8 tracking ID space, so they
+look random but are unique by construction and need no existence checks.
+Sequence numbers are reserved from the database in blocks, each in its
+own durable transaction: a block reserved inside a request transaction
+would be rewound by a rollback while this process kept handing it out, so
+callers must allocate IDs before opening one.
+
+The permutation key must never change once IDs have been issued, otherwise
+new IDs may collide with old ones.
+"""
+
+import hashlib
+import hmac
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+ID_LENGTH = 8
+ID_SPACE = len(ALPHABET) ** ID_LENGTH
+
+HALF_BITS = 21  # 2**42 is the smallest even-width domain covering 36**8
+HALF_MASK = (1 << HALF_BITS) - 1
+ROUNDS = 4
+
+SEQUENCE_NAME = "issue_report"
+
+
+class FeistelPermutation:
+    """Keyed bijection on range(ID_SPACE) using cycle walking."""
+
+    def __init__(self, key):
+        self.round_keys = [
+            hmac.new(key, f"tracking-round-{i}".encode(), hashlib.sha256).digest()
+            for i in range(ROUNDS)
+        ]
+
+    def _round(self, round_key, half):
+        digest = hmac.new(round_key, half.to_bytes(3, "big"), hashlib.sha256).digest()
+        return int.from_bytes(digest[:3], "big") & HALF_MASK
+
+    def _permute_block(self, value):
+        left, right = value >> HALF_BITS, value & HALF_MASK
+        for round_key in self.round_keys:
+            left, right = right, left ^ self._round(round_key, right)
+        return (left << HALF_BITS) | right
+
+    def permute(self, value):
+        if not 0 <= value < ID_SPACE:
+            raise ValueError("sequence number out of tracking ID range")
+        # Walk the cycle until we land back inside the ID space; each step
+        # lands outside with probability ~36%, so this ends almost at once.
+        value = self._permute_block(value)
+        while value >= ID_SPACE:
+            value = self._permute_block(value)
+        return value
+
+
+def encode(value):
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, index = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+class TrackingIdAllocator:
+    """
+    Hands out tracking IDs from sequence blocks reserved in the database,
+    so only one query is needed per `block_size` reports.
+    """
+
+    def __init__(self, key, block_size=100):
+        self.permutation = FeistelPermutation(key)
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+    def _reserve_block(self):
+        from .models import TrackingSequence
+
+        # durable=True raises instead of silently joining an outer transaction.
+        with transaction.atomic(durable=True):
+            sequence, _ = TrackingSequence.objects.select_for_update().get_or_create(
+                name=SEQUENCE_NAME
+            )
+            start = sequence.next_value
+            TrackingSequence.objects.filter(pk=sequence.pk).update(
+                next_value=F("next_value") + self.block_size
+            )
+        return start, start + self.block_size
+
+    def next_sequence(self):
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self._reserve_block()
+            value = self._next
+            self._next += 1
+            return value
+
+    def next_id(self):
+        return encode(self.permutation.permute(self.next_sequence()))
+
+
+_allocator = None
+_allocator_lock = threading.Lock()
+
+
+def get_tracking_id_allocator():
+    global _allocator
+    if _allocator is None:
+        with _allocator_lock:
+            if _allocator is None:
+                key = getattr(settings, "TRACKING_ID_SECRET", None) or settings.SECRET_KEY
+                _allocator = TrackingIdAllocator(
+                    key.encode(),
+                    block_size=getattr(settings, "TRACKING_ID_BLOCK_SIZE", 100),
+                )
+    return _allocator
+
+
+def next_tracking_id():
+    return get_tracking_id_allocator().next_id()
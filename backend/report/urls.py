@@ -1,8 +1,8 @@
 from django.urls import path
 from .views import (
-    IssueReportListCreateView, presign_s3, presign_get_for_track,
+    IssueReportListCreateView, presign_s3, presign_get_for_track, presign_get_batch,
     CommunityResolvedIssuesView, UserIssueHistoryView,
-    CommentListCreateView, ToggleLikeView, ToggleDislikeView, submit_appeal,
+    CommentListCreateView, ReactionView, ToggleLikeView, ToggleDislikeView, submit_appeal,
     ReportEligibilityView,
 )
 
@@ -11,12 +11,14 @@ urlpatterns = [
     path("eligibility/", ReportEligibilityView.as_view(), name="report-eligibility"),
     path("s3/presign/", presign_s3, name="presign-s3"),
     path("<int:id>/presign-get/", presign_get_for_track, name="presign-get"),
+    path("presign-get/batch/", presign_get_batch, name="presign-get-batch"),
     path("community/resolved/", CommunityResolvedIssuesView.as_view()),
     path("history/", UserIssueHistoryView.as_view(), name="user-issue-history"),
     path("<int:report_id>/appeal/", submit_appeal, name="report-appeal"),
     
     # Social Endpoints
     path("<int:report_id>/comments/", CommentListCreateView.as_view(), name="report-comments"),
+    path("<int:report_id>/react/", ReactionView.as_view(), name="report-react"),
     path("<int:report_id>/like/", ToggleLikeView.as_view(), name="report-like"),
     path("<int:report_id>/dislike/", ToggleDislikeView.as_view(), name="report-dislike"),
 ]
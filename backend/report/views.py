@@ -4,45 +4,134 @@ from rest_framework.pagination import CursorPagination
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from datetime import timedelta
 from zoneinfo import ZoneInfo
 from .serializers import IssueHistorySerializer, CommentSerializer
-from user_profile.models import UserProfile
-from .models import IssueReport, Comment
-from .serializers import IssueReportSerializer
+from users.cache import get_user_profile
+from .models import IssueReport, Comment, Reaction
+from .serializers import TRACKING_ID_ATTEMPTS, IssueReportSerializer
+from .tracking import next_tracking_id
+from .cache import (
+    bump_community_feed_generation,
+    bump_report_detail_version,
+    community_feed_timeout,
+    community_page_key,
+    daily_report_count_key,
+    report_detail_key,
+    report_detail_timeout,
+)
+from report_hub.cache import get_or_compute
+from report_hub.throttling import PresignThrottle, ReportCreateThrottle
 from django.conf import settings
-import boto3
+from django.core.cache import cache
+from .s3 import get_presigner, presigned_get_url, presigned_put_url
 import uuid
 
 
-def get_daily_report_limit_status(user):
+DAILY_REPORT_LIMIT = 4
+
+
+def _ist_day_bounds():
     ist = ZoneInfo("Asia/Kolkata")
     now_ist = timezone.now().astimezone(ist)
     start_of_day_ist = now_ist.replace(hour=0, minute=0, second=0, microsecond=0)
     next_midnight_ist = start_of_day_ist + timedelta(days=1)
+    return now_ist, start_of_day_ist, next_midnight_ist
+
+
+def _daily_count_key(user, start_of_day_ist, next_midnight_ist, now_ist):
+    """
+    Cache key holding the user's submissions for the IST day, rebuilt from
+    the database on a miss and expiring at the next IST midnight.
+    """
+    key = daily_report_count_key(user.pk, start_of_day_ist.date())
+    if cache.get(key) is None:
+        submission_count = _count_submissions(user, start_of_day_ist, next_midnight_ist)
+        seconds_to_midnight = (next_midnight_ist - now_ist).total_seconds()
+        cache.add(key, submission_count, timeout=max(1, int(seconds_to_midnight)))
+    return key
+
 
-    start_of_day_utc = start_of_day_ist.astimezone(ZoneInfo("UTC"))
-    next_midnight_utc = next_midnight_ist.astimezone(ZoneInfo("UTC"))
+def _uses_cache_counter():
+    return getattr(settings, "DAILY_REPORT_LIMIT_CACHE", False)
 
-    submission_count = IssueReport.objects.filter(
+
+def _count_submissions(user, start_of_day_ist, next_midnight_ist):
+    return IssueReport.objects.filter(
         user=user,
-        issue_date__gte=start_of_day_utc,
-        issue_date__lt=next_midnight_utc,
+        issue_date__gte=start_of_day_ist.astimezone(ZoneInfo("UTC")),
+        issue_date__lt=next_midnight_ist.astimezone(ZoneInfo("UTC")),
     ).count()
 
-    daily_limit = 4
+
+def _limit_status(submission_count, next_midnight_ist):
     return {
         "count": submission_count,
-        "limit": daily_limit,
-        "can_submit": submission_count < daily_limit,
+        "limit": DAILY_REPORT_LIMIT,
+        "can_submit": submission_count < DAILY_REPORT_LIMIT,
         "retry_at_label": "12:00 AM IST",
         "retry_at_ist": next_midnight_ist.isoformat(),
     }
 
 
+def get_daily_report_limit_status(user):
+    now_ist, start_of_day_ist, next_midnight_ist = _ist_day_bounds()
+    if not _uses_cache_counter():
+        return _limit_status(
+            _count_submissions(user, start_of_day_ist, next_midnight_ist),
+            next_midnight_ist,
+        )
+    key = _daily_count_key(user, start_of_day_ist, next_midnight_ist, now_ist)
+    return _limit_status(cache.get(key, 0), next_midnight_ist)
+
+
+def reserve_daily_report_slot(user):
+    """
+    Atomically claim one of today's submissions. The counter is incremented
+    first and rolled back when it overshoots, so concurrent submissions can
+    never both take the last slot. Returns (status, key); pass the key to
+    release_daily_report_slot if the report is not created after all.
+
+    Without a shared cache the day's reports are counted in the database
+    under a lock on the user row; call this inside the transaction that
+    creates the report. The returned key is then None.
+    """
+    now_ist, start_of_day_ist, next_midnight_ist = _ist_day_bounds()
+    if not _uses_cache_counter():
+        user.__class__.objects.select_for_update().filter(pk=user.pk).exists()
+        submission_count = _count_submissions(user, start_of_day_ist, next_midnight_ist)
+        return _limit_status(submission_count, next_midnight_ist), None
+
+    key = _daily_count_key(user, start_of_day_ist, next_midnight_ist, now_ist)
+    try:
+        submission_count = cache.incr(key)
+    except ValueError:
+        # Evicted between the rebuild and the increment; rebuild once more.
+        key = _daily_count_key(user, start_of_day_ist, next_midnight_ist, now_ist)
+        submission_count = cache.incr(key)
+
+    if submission_count > DAILY_REPORT_LIMIT:
+        release_daily_report_slot(key)
+        return _limit_status(submission_count - 1, next_midnight_ist), None
+
+    return _limit_status(submission_count - 1, next_midnight_ist), key
+
+
+def release_daily_report_slot(key):
+    if key is None:
+        return
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass
+
+
 class ReportEligibilityView(views.APIView):
     permission_classes = [IsAuthenticated]
 
@@ -52,9 +141,14 @@ class ReportEligibilityView(views.APIView):
 
 
 class IssueReportListCreateView(generics.ListCreateAPIView):
-    queryset = IssueReport.objects.all().order_by("-updated_at")
     serializer_class = IssueReportSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ReportCreateThrottle]
+
+    def get_queryset(self):
+        return IssueReport.objects.with_social_context(self.request.user).order_by(
+            "-updated_at"
+        )
 
     def get_serializer_context(self):
         """Pass request to serializer for user context"""
@@ -70,29 +164,48 @@ class IssueReportListCreateView(generics.ListCreateAPIView):
                 "Account is temporarily deactivated. Please wait until reactivation."
             )
 
-        profile, _ = UserProfile.objects.get_or_create(user=user)
+        profile = get_user_profile(user)
 
-        if not profile.is_aadhaar_verified or not profile.aadhaar:
+        if not profile.is_aadhaar_verified or not profile.aadhaar_id:
             raise PermissionDenied(
                 "Aadhaar verification is required before creating a report."
             )
 
-        limit_status = get_daily_report_limit_status(user)
-        if not limit_status["can_submit"]:
-            raise ValidationError(
-                {
-                    "code": "DAILY_REPORT_LIMIT",
-                    "detail": "You cannot post more than 4 reports in a day.",
-                    "retry_at_label": limit_status["retry_at_label"],
-                    "retry_at_ist": limit_status["retry_at_ist"],
-                }
-            )
-
-        serializer.save(user=user)
+        for attempt in range(TRACKING_ID_ATTEMPTS):
+            # Allocated before the transaction, see report.tracking.
+            tracking_id = next_tracking_id()
+            try:
+                self._save_within_daily_limit(serializer, user, tracking_id)
+                return
+            except IntegrityError:
+                # Allocated IDs never repeat, but may hit one issued by the
+                # old random generator; move on to the next sequence number.
+                if attempt == TRACKING_ID_ATTEMPTS - 1:
+                    raise
+
+    def _save_within_daily_limit(self, serializer, user, tracking_id):
+        with transaction.atomic():
+            limit_status, slot_key = reserve_daily_report_slot(user)
+            if not limit_status["can_submit"]:
+                raise ValidationError(
+                    {
+                        "code": "DAILY_REPORT_LIMIT",
+                        "detail": "You cannot post more than 4 reports in a day.",
+                        "retry_at_label": limit_status["retry_at_label"],
+                        "retry_at_ist": limit_status["retry_at_ist"],
+                    }
+                )
+
+            try:
+                serializer.save(user=user, tracking_id=tracking_id)
+            except Exception:
+                release_daily_report_slot(slot_key)
+                raise
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@throttle_classes([PresignThrottle])
 def presign_s3(request):
     """
     Return a pre-signed S3 URL for direct image upload.
@@ -118,27 +231,9 @@ def presign_s3(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    region_name = getattr(settings, "AWS_REGION", "ap-south-1")
-
     try:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=getattr(settings, "AWS_ACCESS_KEY_ID", None),
-            aws_secret_access_key=getattr(settings, "AWS_SECRET_ACCESS_KEY", None),
-            region_name=region_name,
-        )
-
         key = f"reports/{uuid.uuid4().hex}-{file_name}"
-
-        presigned_url = s3_client.generate_presigned_url(
-            "put_object",
-            Params={
-                "Bucket": bucket_name,
-                "Key": key,
-                "ContentType": content_type,
-            },
-            ExpiresIn=3600,  # 1 hour
-        )
+        presigned_url = presigned_put_url(bucket_name, key, content_type)
 
         return Response({"url": presigned_url, "key": key})
     except Exception as e:
@@ -168,58 +263,125 @@ def presign_get_for_track(request, id):
             status=500,
         )
 
-    region_name = getattr(settings, "AWS_REGION", "ap-south-1")
-
     try:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=region_name,
-        )
+        get_presigner()
     except Exception as e:
-        print(f"Error creating S3 client: {e}")
+        print(f"Error creating S3 presigner: {e}")
         return Response(
             {"detail": "Could not connect to S3"},
             status=500,
         )
 
+    return Response(
+        presign_report_images(bucket_name, report.id, report.image_url, report.completion_url)
+    )
+
+
+def presign_report_images(bucket_name, report_id, image_url, completion_url):
+    """
+    Presigned before/after URLs for a report's images; a URL that fails to
+    sign is returned as None rather than failing the whole response.
+    """
     before_url = None
     after_url = None
 
-    if report.image_url:
+    if image_url:
         try:
-            before_url = s3_client.generate_presigned_url(
-                "get_object",
-                Params={
-                    "Bucket": bucket_name,
-                    "Key": report.image_url,
-                },
-                ExpiresIn=3600,
-            )
+            before_url = presigned_get_url(bucket_name, image_url)
         except Exception as e:
-            print(f"Error generating before_url for report {id}: {e}")
+            print(f"Error generating before_url for report {report_id}: {e}")
             before_url = None
 
-    if report.completion_url:
+    if completion_url:
         try:
-            after_url = s3_client.generate_presigned_url(
-                "get_object",
-                Params={
-                    "Bucket": bucket_name,
-                    "Key": report.completion_url,
-                },
-                ExpiresIn=3600,
-            )
+            after_url = presigned_get_url(bucket_name, completion_url)
         except Exception as e:
-            print(f"Error generating after_url for report {id}: {e}")
+            print(f"Error generating after_url for report {report_id}: {e}")
             after_url = None
 
-    return Response({
+    return {
         "url": before_url,
         "before": before_url,
         "after": after_url,
-    })
+    }
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def presign_get_batch(request):
+    """
+    Generate presigned image URLs for many reports with a single lookup.
+    Body: {"ids": [1, 2]} or {"tracking_ids": ["AB12CD34"]}
+    Returns results in request order; unknown reports get an error entry.
+    """
+    ids = request.data.get("ids")
+    tracking_ids = request.data.get("tracking_ids")
+    if bool(ids) == bool(tracking_ids):
+        return Response(
+            {"detail": "Provide exactly one of ids or tracking_ids"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    lookup_field = "id" if ids else "tracking_id"
+    lookups = ids or tracking_ids
+    max_items = getattr(settings, "PRESIGN_BATCH_MAX_ITEMS", 50)
+    if not isinstance(lookups, list) or len(lookups) > max_items:
+        return Response(
+            {"detail": f"Provide a list of at most {max_items} reports"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if lookup_field == "id":
+        try:
+            lookups = [int(value) for value in lookups]
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "ids must be integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    elif not all(isinstance(value, str) for value in lookups):
+        return Response(
+            {"detail": "tracking_ids must be strings"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    bucket_name = getattr(settings, "REPORT_IMAGES_BUCKET", None)
+    if not bucket_name:
+        return Response(
+            {"detail": "REPORT_IMAGES_BUCKET is not configured on the server"},
+            status=500,
+        )
+
+    try:
+        get_presigner()
+    except Exception as e:
+        print(f"Error creating S3 presigner: {e}")
+        return Response(
+            {"detail": "Could not connect to S3"},
+            status=500,
+        )
+
+    reports = {
+        getattr(report, lookup_field): report
+        for report in IssueReport.objects.filter(
+            **{f"{lookup_field}__in": lookups}
+        ).only("id", "tracking_id", "image_url", "completion_url")
+    }
+
+    results = []
+    for lookup in lookups:
+        report = reports.get(lookup)
+        if report is None:
+            results.append({lookup_field: lookup, "detail": "Report not found"})
+            continue
+        results.append({
+            "id": report.id,
+            "tracking_id": report.tracking_id,
+            **presign_report_images(
+                bucket_name, report.id, report.image_url, report.completion_url
+            ),
+        })
+
+    return Response({"results": results})
 
 
 class PublicIssueReportDetailView(generics.RetrieveAPIView):
@@ -227,18 +389,35 @@ class PublicIssueReportDetailView(generics.RetrieveAPIView):
     Public endpoint to fetch a single report by tracking_id.
     No authentication required.
     """
-    queryset = IssueReport.objects.all()
     serializer_class = IssueReportSerializer
     permission_classes = [AllowAny]
     lookup_field = "tracking_id"
     lookup_url_kwarg = "tracking_id"
 
+    def get_queryset(self):
+        return IssueReport.objects.with_social_context(self.request.user)
+
     def get_serializer_context(self):
         """Pass request to serializer for user context"""
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
 
+    def retrieve(self, request, *args, **kwargs):
+        # Reaction flags are per viewer, so only anonymous responses are shared.
+        if request.user.is_authenticated:
+            return super().retrieve(request, *args, **kwargs)
+
+        tracking_id = kwargs[self.lookup_url_kwarg]
+        data = get_or_compute(
+            report_detail_key(tracking_id),
+            lambda: super(PublicIssueReportDetailView, self).retrieve(
+                request, *args, **kwargs
+            ).data,
+            timeout=report_detail_timeout(),
+        )
+        return Response(data)
+
 
 class CommunityCursorPagination(CursorPagination):
     page_size = 6
@@ -257,7 +436,7 @@ class CommunityResolvedIssuesView(ListAPIView):
     def get_queryset(self):
         return IssueReport.objects.filter(
             status="resolved"
-        ).order_by("-updated_at")
+        ).with_social_context(self.request.user).order_by("-updated_at")
     
     def get_serializer_context(self):
         """Pass request to serializer for user context"""
@@ -265,6 +444,34 @@ class CommunityResolvedIssuesView(ListAPIView):
         context['request'] = self.request
         return context
 
+    def list(self, request, *args, **kwargs):
+        # Pages carry per-viewer reaction flags, so only anonymous ones are shared.
+        if request.user.is_authenticated:
+            data = super().list(request, *args, **kwargs).data
+        else:
+            cursor = request.query_params.get(self.paginator.cursor_query_param)
+            data = get_or_compute(
+                community_page_key(cursor),
+                lambda: super(CommunityResolvedIssuesView, self).list(
+                    request, *args, **kwargs
+                ).data,
+                timeout=community_feed_timeout(),
+            )
+        # Presigned URLs expire, so they are added after the page cache.
+        return Response(self._with_images(data))
+
+    def include_images(self):
+        return self.request.query_params.get("include_images") in ("1", "true")
+
+    def _with_images(self, data):
+        bucket_name = getattr(settings, "REPORT_IMAGES_BUCKET", None)
+        if self.include_images() and bucket_name:
+            for item in data["results"]:
+                item["images"] = presign_report_images(
+                    bucket_name, item["id"], item["image_url"], item["completion_url"]
+                )
+        return data
+
 
 class UserIssueHistoryView(generics.ListAPIView):
     """
@@ -328,60 +535,120 @@ class CommentListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         report_id = self.kwargs.get('report_id')
         report = get_object_or_404(IssueReport, id=report_id)
-        serializer.save(user=self.request.user, report=report)
+        with transaction.atomic():
+            serializer.save(user=self.request.user, report=report)
+            IssueReport.objects.filter(pk=report.pk).update(
+                comments_count=F("comments_count") + 1
+            )
+        bump_report_detail_version(report.tracking_id)
+        if report.status == "resolved":
+            bump_community_feed_generation()
+
+
+def toggle_reaction(report_id, user, kind):
+    """
+    Toggle the user's `kind` reaction on a report: the same kind is removed,
+    the opposite kind is switched and otherwise a new reaction is inserted.
+    Counters move with F() in the same transaction and the fresh values
+    are returned as (is_now_set, likes_count, dislikes_count).
+    """
+    counter = Reaction.counter_field(kind)
+    other_kind = Reaction.DISLIKE if kind == Reaction.LIKE else Reaction.LIKE
+    other_counter = Reaction.counter_field(other_kind)
+    user_reaction = Reaction.objects.filter(report_id=report_id, user=user)
+
+    with transaction.atomic():
+        removed, _ = user_reaction.filter(kind=kind).delete()
+        if removed:
+            is_set = False
+            updates = {counter: F(counter) - 1}
+        else:
+            is_set = True
+            switched = user_reaction.exclude(kind=kind).update(kind=kind)
+            if not switched:
+                try:
+                    with transaction.atomic():
+                        Reaction.objects.create(report_id=report_id, user=user, kind=kind)
+                except IntegrityError:
+                    # A concurrent request for the same user won the insert.
+                    switched = user_reaction.exclude(kind=kind).update(kind=kind)
+                    updates = {}
+                else:
+                    updates = {counter: F(counter) + 1}
+            if switched:
+                updates = {counter: F(counter) + 1, other_counter: F(other_counter) - 1}
+
+        report_rows = IssueReport.objects.filter(pk=report_id)
+        if updates:
+            report_rows.update(**updates)
+        row = report_rows.values_list(
+            "likes_count", "dislikes_count", "status", "tracking_id"
+        ).first()
+        if row is None:
+            raise Http404("Report not found")
+
+    likes_count, dislikes_count, report_status, tracking_id = row
+    if updates:
+        bump_report_detail_version(tracking_id)
+        if report_status == "resolved":
+            bump_community_feed_generation()
+    return is_set, likes_count, dislikes_count
+
+
+class ReactionView(views.APIView):
+    """
+    Toggle a like or dislike on a report
+    Body: {"kind": "like" | "dislike"}
+    Returns whether the reaction is now set and the fresh counts
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    reaction_kind = None
+
+    def post(self, request, report_id):
+        kind = self.reaction_kind or request.data.get("kind")
+        if kind not in (Reaction.LIKE, Reaction.DISLIKE):
+            return Response(
+                {"detail": "kind must be 'like' or 'dislike'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        is_set, likes_count, dislikes_count = toggle_reaction(report_id, request.user, kind)
+
+        return Response({
+            "kind": kind,
+            "active": is_set,
+            "likes_count": likes_count,
+            "dislikes_count": dislikes_count,
+        })
 
 
-class ToggleLikeView(views.APIView):
+class ToggleLikeView(ReactionView):
     """
     Toggle like on a report
     Returns updated like/dislike counts
     """
-    permission_classes = [permissions.IsAuthenticated]
+    reaction_kind = Reaction.LIKE
 
     def post(self, request, report_id):
-        report = get_object_or_404(IssueReport, id=report_id)
-        user = request.user
-        
-        if report.likes.filter(id=user.id).exists():
-            report.likes.remove(user)
-            liked = False
-        else:
-            report.likes.add(user)
-            # Remove dislike if exists
-            if report.dislikes.filter(id=user.id).exists():
-                report.dislikes.remove(user)
-            liked = True
-            
+        response = super().post(request, report_id)
         return Response({
-            "liked": liked, 
-            "likes_count": report.likes.count(),
-            "dislikes_count": report.dislikes.count()
+            "liked": response.data["active"],
+            "likes_count": response.data["likes_count"],
+            "dislikes_count": response.data["dislikes_count"]
         })
 
 
-class ToggleDislikeView(views.APIView):
+class ToggleDislikeView(ReactionView):
     """
     Toggle dislike on a report
     Returns updated like/dislike counts
     """
-    permission_classes = [permissions.IsAuthenticated]
+    reaction_kind = Reaction.DISLIKE
 
     def post(self, request, report_id):
-        report = get_object_or_404(IssueReport, id=report_id)
-        user = request.user
-        
-        if report.dislikes.filter(id=user.id).exists():
-            report.dislikes.remove(user)
-            disliked = False
-        else:
-            report.dislikes.add(user)
-            # Remove like if exists
-            if report.likes.filter(id=user.id).exists():
-                report.likes.remove(user)
-            disliked = True
-            
+        response = super().post(request, report_id)
         return Response({
-            "disliked": disliked, 
-            "likes_count": report.likes.count(),
-            "dislikes_count": report.dislikes.count()
+            "disliked": response.data["active"],
+            "likes_count": response.data["likes_count"],
+            "dislikes_count": response.data["dislikes_count"]
         })
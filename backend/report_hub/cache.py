@@ -0,0 +1,168 @@
+"""
+Cache and request coalescing helpers shared across apps.
+
+get_or_compute protects hot keys from cache stampedes: entries carry their
+logical expiry and recompute cost, are refreshed early with a probability
+that grows as expiry approaches (XFetch), and only the worker holding the
+per-key lock recomputes while everyone else keeps serving the stale value.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+LOCK_SUFFIX = ":lock"
+
+
+def _lock_key(key):
+    return f"{key}{LOCK_SUFFIX}"
+
+
+def _should_refresh(delta, expires_at, beta, now):
+    # -log(U) is exponentially distributed; scaled by the recompute cost it
+    # makes early refreshes rare until the entry is close to expiring.
+    jitter = -delta * beta * math.log(1.0 - random.random())
+    return now + jitter >= expires_at
+
+
+def _recompute(key, compute, timeout, stale_timeout):
+    started = time.monotonic()
+    try:
+        value = compute()
+        delta = time.monotonic() - started
+        cache.set(
+            key,
+            (value, delta, time.time() + timeout),
+            timeout=timeout + stale_timeout,
+        )
+        return value
+    finally:
+        cache.delete(_lock_key(key))
+
+
+def get_or_compute(
+    key,
+    compute,
+    timeout,
+    *,
+    beta=1.0,
+    stale_timeout=None,
+    lock_timeout=10,
+    wait_interval=0.05,
+):
+    """
+    Return the cached value for `key`, calling `compute()` at most once per
+    expiry across all workers sharing the cache.
+
+    Entries stay readable for `stale_timeout` seconds past their logical
+    `timeout` so there is something to serve while one worker recomputes.
+    On a cold miss the losers of the lock race poll for up to
+    `lock_timeout` seconds before computing the value themselves; if the
+    leader fails, the next poller to grab the lock recomputes straight away.
+    """
+    if stale_timeout is None:
+        stale_timeout = timeout
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires_at = entry
+        if not _should_refresh(delta, expires_at, beta, time.time()):
+            return value
+        if not cache.add(_lock_key(key), 1, timeout=lock_timeout):
+            return value
+        return _recompute(key, compute, timeout, stale_timeout)
+
+    if cache.add(_lock_key(key), 1, timeout=lock_timeout):
+        return _recompute(key, compute, timeout, stale_timeout)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(wait_interval)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        # The leader released the lock without storing a value (compute
+        # raised), so take over rather than waiting out the timeout.
+        if cache.add(_lock_key(key), 1, timeout=lock_timeout):
+            return _recompute(key, compute, timeout, stale_timeout)
+
+    return compute()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key within a process: the first
+    caller runs the function and everyone arriving meanwhile waits for and
+    shares its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, func):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class LocalTTLCache:
+    """Thread-safe in-process LRU whose entries also expire after a TTL."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,186 @@
+"""
+Offline reverse geocoding from the Locality gazetteer.
+
+Localities are loaded once per process into a 2-d tree over an
+equirectangular projection, which keeps nearest-neighbour lookups well
+under a millisecond and needs no network. The load_gazetteer command bumps
+a version in the shared cache so running workers rebuild their index.
+"""
+
+import math
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+EARTH_RADIUS_KM = 6371.0088
+INDEX_VERSION_KEY = "geocode:gazetteer:version"
+VERSION_CHECK_INTERVAL = 60
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class KDTree:
+    """
+    Static 2-d tree over (x, y) points stored in flat lists; node i splits
+    on axis depth % 2 with its left and right subtrees in left[i]/right[i].
+    """
+
+    def __init__(self, points, payloads):
+        self.points = []
+        self.payloads = []
+        self.left = []
+        self.right = []
+        self.axis = []
+        self.root = self._build(list(zip(points, payloads)), 0)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, items, depth):
+        if not items:
+            return -1
+        axis = depth % 2
+        items.sort(key=lambda item: item[0][axis])
+        median = len(items) // 2
+        node = len(self.points)
+        self.points.append(items[median][0])
+        self.payloads.append(items[median][1])
+        self.axis.append(axis)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.left[node] = self._build(items[:median], depth + 1)
+        self.right[node] = self._build(items[median + 1:], depth + 1)
+        return node
+
+    def nearest(self, point):
+        """Return (payload, squared distance) of the closest point."""
+        best = [-1, math.inf]
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            node_point = self.points[node]
+            dx = node_point[0] - point[0]
+            dy = node_point[1] - point[1]
+            distance = dx * dx + dy * dy
+            if distance < best[1]:
+                best = [node, distance]
+
+            diff = point[self.axis[node]] - node_point[self.axis[node]]
+            near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+            # Visit the far side only if the splitting plane is closer than the best match.
+            if diff * diff < best[1]:
+                stack.append(far)
+            stack.append(near)
+
+        if best[0] < 0:
+            return None, math.inf
+        return self.payloads[best[0]], best[1]
+
+
+def _project(lat, lon):
+    # Equirectangular projection in km; accurate enough to pick the nearest
+    # locality, the final distance is recomputed with haversine.
+    x = math.radians(lon) * math.cos(math.radians(lat)) * EARTH_RADIUS_KM
+    y = math.radians(lat) * EARTH_RADIUS_KM
+    return x, y
+
+
+class GazetteerIndex:
+    def __init__(self):
+        self._tree = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        return cache.get(INDEX_VERSION_KEY, 0)
+
+    def _load(self):
+        locality = apps.get_model("report", "Locality")
+        rows = list(
+            locality.objects.values_list(
+                "latitude", "longitude", "name", "ward", "city", "state", "postcode"
+            )
+        )
+        points = [_project(row[0], row[1]) for row in rows]
+        return KDTree(points, rows)
+
+    def tree(self):
+        now = time.monotonic()
+        if self._tree is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return self._tree
+        with self._lock:
+            version = self._current_version()
+            if self._tree is None or version != self._version:
+                self._tree = self._load()
+                self._version = version
+            self._checked_at = now
+            return self._tree
+
+    def invalidate(self):
+        with self._lock:
+            self._tree = None
+
+    def nearest(self, lat, lon):
+        """Return (row, distance_km) of the nearest locality, or (None, inf)."""
+        row, _ = self.tree().nearest(_project(lat, lon))
+        if row is None:
+            return None, math.inf
+        return row, haversine_km(lat, lon, row[0], row[1])
+
+
+index = GazetteerIndex()
+
+
+def bump_gazetteer_version():
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(INDEX_VERSION_KEY, 1, timeout=None)
+    index.invalidate()
+
+
+def _as_nominatim(row, lat, lon):
+    latitude, longitude, name, ward, city, state, postcode = row
+    address = {
+        "suburb": name,
+        "city_district": ward,
+        "city": city,
+        "state": state,
+        "postcode": postcode,
+        "country": "India",
+        "country_code": "in",
+    }
+    parts = [name, ward, city, state, postcode, "India"]
+    return {
+        "lat": str(lat),
+        "lon": str(lon),
+        "name": name,
+        "display_name": ", ".join(part for part in parts if part),
+        "address": {key: value for key, value in address.items() if value},
+        "source": "gazetteer",
+    }
+
+
+def reverse_geocode_offline(lat, lon):
+    """
+    Nominatim-shaped result from the gazetteer, or None when it is disabled
+    or the nearest locality is beyond GEOCODE_GAZETTEER_MAX_DISTANCE_KM.
+    """
+    if not getattr(settings, "GEOCODE_GAZETTEER_ENABLED", True):
+        return None
+    row, distance_km = index.nearest(lat, lon)
+    if row is None or distance_km > getattr(settings, "GEOCODE_GAZETTEER_MAX_DISTANCE_KM", 1.0):
+        return None
+    return _as_nominatim(row, lat, lon)
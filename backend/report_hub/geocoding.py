@@ -0,0 +1,314 @@
+"""
+Reverse geocoding through Nominatim with a two-tier cache.
+
+Points close to a gazetteer locality are answered offline from
+report_hub.gazetteer. Other coordinates are quantized to a geohash cell so
+nearby users share one upstream lookup. Results are kept in a small
+in-process LRU in front of the shared Django cache; upstream failures are
+cached briefly as well so a struggling Nominatim is not hammered.
+Concurrent misses for the same cell share one upstream call made over a
+pooled keep-alive session. Nominatim's usage policy allows one request per
+second, so upstream calls go out one at a time and are spaced out across
+workers through a slot key in the shared cache.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+from report_hub.cache import LocalTTLCache, SingleFlight
+from report_hub.gazetteer import reverse_geocode_offline
+
+NOMINATIM_REVERSE_URL = "https://nominatim.openstreetmap.org/reverse"
+USER_AGENT = "ReportMitra/1.0 (contact@reportmitra.in)"
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+FAILURE = "__failure__"
+
+
+class GeocodingError(Exception):
+    pass
+
+
+def encode_geohash(lat, lon, precision):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, value_range = (lon, lon_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def decode_geohash(geohash):
+    """Return the (lat, lon) center of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if bits >> shift & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+class GeocodeStats:
+    FIELDS = (
+        "gazetteer_hits",
+        "local_hits",
+        "shared_hits",
+        "negative_hits",
+        "misses",
+        "upstream_errors",
+        "upstream_busy",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, field):
+        with self._lock:
+            self._counts[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+class UpstreamLimiter:
+    """
+    One upstream request in flight per process, and at most one request per
+    GEOCODE_UPSTREAM_INTERVAL seconds across workers sharing the cache.
+    Callers that cannot get a slot within GEOCODE_UPSTREAM_MAX_WAIT seconds
+    get a GeocodingError.
+    """
+
+    slot_key = "geocode:upstream-slot"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        interval = getattr(settings, "GEOCODE_UPSTREAM_INTERVAL", 1.0)
+        max_wait = getattr(settings, "GEOCODE_UPSTREAM_MAX_WAIT", 10)
+        deadline = time.monotonic() + max_wait
+        if not self._lock.acquire(timeout=max_wait):
+            raise GeocodingError("Nominatim is busy")
+        try:
+            while interval > 0 and not cache.add(
+                self.slot_key, 1, timeout=math.ceil(interval)
+            ):
+                if time.monotonic() >= deadline:
+                    raise GeocodingError("Nominatim is busy")
+                time.sleep(min(0.05, interval))
+            yield
+        finally:
+            self._lock.release()
+
+
+local_cache = LocalTTLCache(getattr(settings, "GEOCODE_LOCAL_CACHE_SIZE", 2048))
+stats = GeocodeStats()
+flights = SingleFlight()
+upstream = UpstreamLimiter()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide session so upstream connections are kept alive and reused."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = getattr(settings, "GEOCODE_HTTP_POOL_SIZE", 10)
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=pool_size
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = USER_AGENT
+                _session = session
+    return _session
+
+
+def _precision():
+    return getattr(settings, "GEOCODE_GEOHASH_PRECISION", 7)
+
+
+def _timeout():
+    return getattr(settings, "GEOCODE_CACHE_TIMEOUT", 24 * 60 * 60)
+
+
+def _negative_timeout():
+    return getattr(settings, "GEOCODE_NEGATIVE_CACHE_TIMEOUT", 60)
+
+
+def geohash_for(lat, lon):
+    return encode_geohash(lat, lon, _precision())
+
+
+def _cache_key(geohash):
+    return f"geocode:reverse:{geohash}"
+
+
+def fetch_reverse(lat, lon):
+    """Single upstream Nominatim reverse lookup."""
+    params = {
+        "format": "jsonv2",
+        "lat": lat,
+        "lon": lon,
+        "accept-language": "en",
+    }
+    url = getattr(settings, "GEOCODE_NOMINATIM_URL", NOMINATIM_REVERSE_URL)
+    res = get_session().get(url, params=params, timeout=5)
+    res.raise_for_status()
+    return res.json()
+
+
+def _cached(geohash):
+    """Look a cell up in both tiers, or return None on a miss."""
+    value = local_cache.get(geohash)
+    if value is not None:
+        stats.incr("negative_hits" if value == FAILURE else "local_hits")
+        return value
+
+    value = cache.get(_cache_key(geohash))
+    if value is not None:
+        stats.incr("negative_hits" if value == FAILURE else "shared_hits")
+        local_cache.set(
+            geohash, value, _negative_timeout() if value == FAILURE else _timeout()
+        )
+    return value
+
+
+def _store(geohash, value, timeout):
+    local_cache.set(geohash, value, timeout)
+    cache.set(_cache_key(geohash), value, timeout=timeout)
+
+
+def _fetch_cell(geohash):
+    # A flight that just finished may already have filled the cache.
+    value = _cached(geohash)
+    if value is not None:
+        return value
+
+    stats.incr("misses")
+    lat, lon = decode_geohash(geohash)
+    try:
+        with upstream.slot():
+            value = fetch_reverse(lat, lon)
+    except GeocodingError:
+        # Not an upstream failure, so nothing is negatively cached.
+        stats.incr("upstream_busy")
+        raise
+    except (requests.RequestException, ValueError):
+        stats.incr("upstream_errors")
+        _store(geohash, FAILURE, _negative_timeout())
+        return FAILURE
+    _store(geohash, value, _timeout())
+    return value
+
+
+def _fetch_coalesced(geohash):
+    return flights.do(geohash, lambda: _fetch_cell(geohash))
+
+
+def _resolve(geohash):
+    value = _cached(geohash)
+    if value is None:
+        value = _fetch_coalesced(geohash)
+
+    if value == FAILURE:
+        raise GeocodingError("Reverse geocoding failed")
+    return value
+
+
+def reverse_geocode_cached(lat, lon):
+    """
+    Nominatim jsonv2 style reverse result: from the gazetteer when a locality
+    is close enough, otherwise for the geohash cell containing lat/lon.
+    """
+    offline = reverse_geocode_offline(lat, lon)
+    if offline is not None:
+        stats.incr("gazetteer_hits")
+        return offline
+    return _resolve(geohash_for(lat, lon))
+
+
+def reverse_geocode_many(points):
+    """
+    Resolve a list of (lat, lon) points, returning one item per point in
+    input order: a result dict, or a GeocodingError for that point.
+
+    Points in the same geohash cell share one lookup, cache hits are served
+    straight away and the remaining cells are fetched upstream one at a time.
+    Once the upstream limiter turns a cell away, the cells after it fail too.
+    """
+    results = [None] * len(points)
+    cells = {}
+    for i, (lat, lon) in enumerate(points):
+        offline = reverse_geocode_offline(lat, lon)
+        if offline is not None:
+            stats.incr("gazetteer_hits")
+            results[i] = offline
+        else:
+            cells.setdefault(geohash_for(lat, lon), []).append(i)
+
+    resolved = {}
+    misses = []
+    for geohash in cells:
+        value = _cached(geohash)
+        if value is None:
+            misses.append(geohash)
+        else:
+            resolved[geohash] = value
+
+    for n, geohash in enumerate(misses):
+        try:
+            resolved[geohash] = _fetch_coalesced(geohash)
+        except GeocodingError:
+            resolved.update(dict.fromkeys(misses[n:], FAILURE))
+            break
+
+    for geohash, indices in cells.items():
+        value = resolved[geohash]
+        if value == FAILURE:
+            value = GeocodingError("Reverse geocoding failed")
+        for i in indices:
+            results[i] = value
+    return results
@@ -25,13 +25,18 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+# Reverse proxies in front of the app. Client IPs used for throttling are
+# read from X-Forwarded-For only as far back as these proxies appended.
+NUM_PROXIES = int(os.getenv("NUM_PROXIES", 0))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "NUM_PROXIES": NUM_PROXIES,
 }
 
 INSTALLED_APPS = [
@@ -119,13 +124,68 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'report_hub.urls'
+
+# Shared cache: Redis when REDIS_URL is set, per-process memory otherwise.
+# Cache version stamps live in their own alias so that culling or evicting
+# ordinary entries can never reset a version back to an older value.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "reportmitra",
+        },
+        "versions": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "reportmitra:versions",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "reportmitra",
+        },
+        "versions": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "reportmitra-versions",
+            "OPTIONS": {"MAX_ENTRIES": 1_000_000},
+        },
+    }
+
+COMMUNITY_FEED_CACHE_TIMEOUT = int(os.getenv("COMMUNITY_FEED_CACHE_TIMEOUT", 300))
+REPORT_DETAIL_CACHE_TIMEOUT = int(os.getenv("REPORT_DETAIL_CACHE_TIMEOUT", 60))
+
+# Reverse geocoding cache; precision 7 geohash cells are roughly 150m x 150m.
+GEOCODE_GEOHASH_PRECISION = int(os.getenv("GEOCODE_GEOHASH_PRECISION", 7))
+GEOCODE_CACHE_TIMEOUT = int(os.getenv("GEOCODE_CACHE_TIMEOUT", 24 * 60 * 60))
+GEOCODE_NEGATIVE_CACHE_TIMEOUT = int(os.getenv("GEOCODE_NEGATIVE_CACHE_TIMEOUT", 60))
+GEOCODE_LOCAL_CACHE_SIZE = int(os.getenv("GEOCODE_LOCAL_CACHE_SIZE", 2048))
+GEOCODE_HTTP_POOL_SIZE = int(os.getenv("GEOCODE_HTTP_POOL_SIZE", 10))
+GEOCODE_BATCH_MAX_ITEMS = int(os.getenv("GEOCODE_BATCH_MAX_ITEMS", 20))
+# Nominatim's usage policy: at most one request per second.
+GEOCODE_UPSTREAM_INTERVAL = float(os.getenv("GEOCODE_UPSTREAM_INTERVAL", 1.0))
+GEOCODE_UPSTREAM_MAX_WAIT = float(os.getenv("GEOCODE_UPSTREAM_MAX_WAIT", 10))
+GEOCODE_NOMINATIM_URL = os.getenv(
+    "GEOCODE_NOMINATIM_URL", "https://nominatim.openstreetmap.org/reverse"
+)
+GEOCODE_GAZETTEER_ENABLED = os.getenv("GEOCODE_GAZETTEER_ENABLED", "True") == "True"
+GEOCODE_GAZETTEER_MAX_DISTANCE_KM = float(os.getenv("GEOCODE_GAZETTEER_MAX_DISTANCE_KM", 1.0))
+
+# Key for the tracking ID permutation; must stay fixed once IDs are issued.
+TRACKING_ID_SECRET = os.getenv("TRACKING_ID_SECRET", SECRET_KEY)
+TRACKING_ID_BLOCK_SIZE = int(os.getenv("TRACKING_ID_BLOCK_SIZE", 100))
 WSGI_APPLICATION = 'report_hub.wsgi.application'
 
 REPORT_IMAGES_BUCKET = os.getenv("REPORT_IMAGES_BUCKET")
 AWS_REGION = os.getenv("AWS_REGION", "ap-south-1")
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
+AWS_SESSION_TOKEN = os.getenv("AWS_SESSION_TOKEN")
 AWS_STORAGE_BUCKET_NAME = REPORT_IMAGES_BUCKET
+PRESIGN_BATCH_MAX_ITEMS = int(os.getenv("PRESIGN_BATCH_MAX_ITEMS", 50))
 
 if not REPORT_IMAGES_BUCKET:
     raise RuntimeError(
@@ -155,11 +215,65 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'ReportMitra <noreply@reportmitra.in>')
 
+# Seconds an authenticated user row stays cached between saves. Off (0)
+# without a shared cache, where invalidations would not reach other workers.
+AUTH_USER_CACHE_TIMEOUT = int(
+    os.getenv("AUTH_USER_CACHE_TIMEOUT", 300 if REDIS_URL else 0)
+)
+
+# Bloom-filter fast path for refresh token blacklist checks. It relies on
+# the shared cache to see tokens other workers blacklisted recently.
+JWT_BLACKLIST_BLOOM_ENABLED = os.getenv(
+    "JWT_BLACKLIST_BLOOM_ENABLED", str(bool(REDIS_URL))
+) == "True"
+JWT_BLACKLIST_BLOOM_REFRESH_SECONDS = int(os.getenv("JWT_BLACKLIST_BLOOM_REFRESH_SECONDS", 300))
+JWT_BLACKLIST_BLOOM_ERROR_RATE = float(os.getenv("JWT_BLACKLIST_BLOOM_ERROR_RATE", 0.001))
+
+# Sliding-window rate limits per scope ("<count>/<period>", None disables).
+# Kept outside REST_FRAMEWORK, which local.py and production.py replace.
+THROTTLE_RATES = {
+    "auth": os.getenv("THROTTLE_RATE_AUTH", "20/min"),
+    "geocode_batch": os.getenv("THROTTLE_RATE_GEOCODE_BATCH", "10/min"),
+    "otp_request": os.getenv("THROTTLE_RATE_OTP_REQUEST", "5/min"),
+    "presign": os.getenv("THROTTLE_RATE_PRESIGN", "60/min"),
+    "report_create": os.getenv("THROTTLE_RATE_REPORT_CREATE", "10/min"),
+}
+
+# Login OTPs live in the shared cache when there is one; a per-process
+# LocMem cache cannot be shared between workers, so use the database then.
+OTP_STORE = os.getenv(
+    "OTP_STORE",
+    "users.otp.CacheOTPStore" if REDIS_URL else "users.otp.DatabaseOTPStore",
+)
+
+# The daily report limit is counted in the cache only when the cache is
+# shared; per-process LocMem counters would allow the limit once per worker.
+DAILY_REPORT_LIMIT_CACHE = os.getenv(
+    "DAILY_REPORT_LIMIT_CACHE", str(bool(REDIS_URL))
+) == "True"
+
+# Celery: Redis broker when REDIS_URL is set. Without a real broker tasks
+# run inline (eager), so local runs and tests need no worker; eager task
+# errors are raised to the caller instead of being stored on the result.
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL or "memory://")
+CELERY_TASK_ALWAYS_EAGER = os.getenv(
+    "CELERY_TASK_ALWAYS_EAGER", str(CELERY_BROKER_URL == "memory://")
+) == "True"
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BEAT_SCHEDULE = {
+    "prune-expired-jwt": {
+        "task": "users.tasks.prune_expired_tokens_task",
+        "schedule": 6 * 60 * 60,
+    },
+}
+
 # Google OAuth - Web Client ID
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID', '')
 GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET', '')
 # Google OAuth - iOS App Client ID
 GOOGLE_CLIENT_ID_APP = os.getenv('GOOGLE_CLIENT_ID_APP', '')
+# Seconds an already verified Google ID token is accepted without re-checking.
+GOOGLE_TOKEN_MEMO_TTL = int(os.getenv('GOOGLE_TOKEN_MEMO_TTL', 300))
 DATABASES = {
     "default": {
         "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.mysql"),
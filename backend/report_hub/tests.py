@@ -0,0 +1,460 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+
+from report.models import Locality
+from report_hub import gazetteer, geocoding, throttling
+from report_hub.cache import SingleFlight, get_or_compute
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def slow_compute(self, value):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(0.2)
+            return value
+        return compute
+
+    def run_concurrently(self, func, workers=8):
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def target():
+            barrier.wait()
+            results.append(func())
+
+        threads = [threading.Thread(target=target) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_cold_miss_computes_once(self):
+        results = self.run_concurrently(
+            lambda: get_or_compute("feed", self.slow_compute("v1"), timeout=60)
+        )
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["v1"] * 8)
+
+    def test_expiry_recomputes_once_and_serves_stale(self):
+        get_or_compute("feed", self.slow_compute("v1"), timeout=0.3, stale_timeout=60)
+        time.sleep(0.4)
+        self.calls = 0
+
+        results = self.run_concurrently(
+            lambda: get_or_compute(
+                "feed", self.slow_compute("v2"), timeout=0.3, stale_timeout=60
+            )
+        )
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(set(results), {"v1", "v2"})
+        self.assertEqual(cache.get("feed")[0], "v2")
+
+    def test_fresh_entries_are_not_recomputed(self):
+        get_or_compute("feed", self.slow_compute("v1"), timeout=60, beta=0)
+
+        self.assertEqual(
+            get_or_compute("feed", self.slow_compute("v2"), timeout=60, beta=0), "v1"
+        )
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_compute_releases_lock(self):
+        def broken():
+            raise RuntimeError("upstream down")
+
+        with self.assertRaises(RuntimeError):
+            get_or_compute("feed", broken, timeout=60)
+
+        self.assertEqual(get_or_compute("feed", lambda: "v1", timeout=60), "v1")
+
+    def test_waiters_take_over_when_the_leader_raises(self):
+        def not_found():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(0.1)
+            raise LookupError("no such report")
+
+        def request():
+            try:
+                return get_or_compute("detail", not_found, timeout=60, lock_timeout=10)
+            except LookupError:
+                return "404"
+
+        started = time.monotonic()
+        results = self.run_concurrently(request, workers=4)
+
+        self.assertEqual(results, ["404"] * 4)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(self.calls, 4)
+
+
+class GeohashTests(SimpleTestCase):
+    def test_known_geohash(self):
+        self.assertEqual(geocoding.encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_decode_returns_cell_center(self):
+        lat, lon = geocoding.decode_geohash("u4pruydqqvj")
+        self.assertEqual(geocoding.encode_geohash(lat, lon, 11), "u4pruydqqvj")
+        self.assertAlmostEqual(lat, 57.64911, places=4)
+        self.assertAlmostEqual(lon, 10.40744, places=4)
+
+
+@override_settings(GEOCODE_GAZETTEER_ENABLED=False, GEOCODE_UPSTREAM_INTERVAL=0)
+class ReverseGeocodeCacheTests(SimpleTestCase):
+    url = "/reverse-geocode/"
+
+    def setUp(self):
+        cache.clear()
+        throttling.previous_counts.clear()
+        geocoding.local_cache.clear()
+        geocoding.stats.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(SimpleNamespace(pk=1, is_authenticated=True))
+        patcher = mock.patch("report_hub.geocoding.fetch_reverse")
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.fetch.return_value = {"display_name": "MG Road, Bengaluru"}
+
+    def test_nearby_points_share_one_upstream_call(self):
+        first = self.client.get(self.url, {"lat": "12.97160", "lon": "77.59460"})
+        second = self.client.get(self.url, {"lat": "12.97165", "lon": "77.59455"})
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(geocoding.stats.snapshot()["local_hits"], 1)
+
+    def test_shared_cache_refills_local_tier(self):
+        self.client.get(self.url, {"lat": 12.9716, "lon": 77.5946})
+        geocoding.local_cache.clear()
+        self.client.get(self.url, {"lat": 12.9716, "lon": 77.5946})
+
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(geocoding.stats.snapshot()["shared_hits"], 1)
+
+    def test_failures_are_negatively_cached(self):
+        self.fetch.side_effect = requests.ConnectionError("down")
+
+        self.assertEqual(self.client.get(self.url, {"lat": 1, "lon": 2}).status_code, 502)
+        self.assertEqual(self.client.get(self.url, {"lat": 1, "lon": 2}).status_code, 502)
+
+        self.assertEqual(self.fetch.call_count, 1)
+        snapshot = geocoding.stats.snapshot()
+        self.assertEqual(snapshot["upstream_errors"], 1)
+        self.assertEqual(snapshot["negative_hits"], 1)
+
+    def test_invalid_coordinates(self):
+        self.assertEqual(self.client.get(self.url, {"lat": "x", "lon": "1"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"lat": 91, "lon": 1}).status_code, 400)
+        self.fetch.assert_not_called()
+
+    def test_batch_dedupes_cells_and_keeps_input_order(self):
+        self.client.get(self.url, {"lat": 28.6139, "lon": 77.2090})
+        self.fetch.reset_mock()
+
+        def fake_fetch(lat, lon):
+            if lat < 10:
+                raise requests.ConnectionError("down")
+            return {"display_name": "MG Road"}
+        self.fetch.side_effect = fake_fetch
+
+        response = self.client.post("/reverse-geocode/batch/", {"points": [
+            {"lat": 12.97160, "lon": 77.59460},
+            {"lat": 1, "lon": 2},
+            {"lat": "x", "lon": 2},
+            {"lat": 28.6139, "lon": 77.2090},
+            {"lat": 12.97165, "lon": 77.59455},
+        ]}, format="json")
+
+        results = response.data["results"]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(results[0]["result"], {"display_name": "MG Road"})
+        self.assertEqual(results[1]["error"], "Reverse geocoding failed")
+        self.assertEqual(results[2]["error"], "Invalid lat/lon")
+        self.assertEqual(results[3]["result"], {"display_name": "MG Road, Bengaluru"})
+        self.assertEqual(results[4]["result"], results[0]["result"])
+        # One upstream call per uncached cell; the cached Delhi cell is reused.
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_batch_rejects_oversized_payload(self):
+        with override_settings(GEOCODE_BATCH_MAX_ITEMS=2):
+            response = self.client.post(
+                "/reverse-geocode/batch/",
+                {"points": [{"lat": 1, "lon": 1}] * 3},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.fetch.assert_not_called()
+
+    def test_batch_requires_authentication(self):
+        response = APIClient().post(
+            "/reverse-geocode/batch/", {"points": [{"lat": 1, "lon": 1}]}, format="json"
+        )
+        self.assertIn(response.status_code, (401, 403))
+        self.fetch.assert_not_called()
+
+    def test_batch_is_throttled(self):
+        with override_settings(THROTTLE_RATES={"geocode_batch": "1/min"}):
+            statuses = [
+                self.client.post(
+                    "/reverse-geocode/batch/", {"points": [{"lat": 1, "lon": 1}]}, format="json"
+                ).status_code
+                for _ in range(2)
+            ]
+        self.assertEqual(statuses, [200, 429])
+
+    def test_upstream_calls_are_spaced_out(self):
+        calls = []
+        self.fetch.side_effect = lambda lat, lon: calls.append(time.monotonic()) or {}
+
+        with override_settings(GEOCODE_UPSTREAM_INTERVAL=1):
+            geocoding.reverse_geocode_many([(1, 1), (2, 2)])
+
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.9)
+
+    def test_busy_upstream_fails_without_negative_caching(self):
+        cache.add(geocoding.UpstreamLimiter.slot_key, 1, timeout=60)
+
+        with override_settings(GEOCODE_UPSTREAM_INTERVAL=1, GEOCODE_UPSTREAM_MAX_WAIT=0.1):
+            results = geocoding.reverse_geocode_many([(1, 1), (2, 2)])
+
+        self.assertTrue(all(isinstance(r, geocoding.GeocodingError) for r in results))
+        self.fetch.assert_not_called()
+        self.assertEqual(geocoding.stats.snapshot()["upstream_busy"], 1)
+        cache.delete(geocoding.UpstreamLimiter.slot_key)
+        geocoding.reverse_geocode_many([(1, 1)])
+        self.fetch.assert_called_once()
+
+
+class StubNominatim(BaseHTTPRequestHandler):
+    hits = 0
+    hits_lock = threading.Lock()
+
+    def do_GET(self):
+        with self.hits_lock:
+            type(self).hits += 1
+        time.sleep(0.3)
+        body = json.dumps({"display_name": "Stub"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_failure_is_shared_and_next_call_retries(self):
+        flights = SingleFlight()
+        with self.assertRaises(ValueError):
+            flights.do("k", mock.Mock(side_effect=ValueError("boom")))
+        self.assertEqual(flights.do("k", lambda: 42), 42)
+
+
+@override_settings(GEOCODE_GAZETTEER_ENABLED=False)
+class ReverseGeocodeSingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        geocoding.local_cache.clear()
+        geocoding.stats.reset()
+        StubNominatim.hits = 0
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubNominatim)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/reverse"
+        settings_override = override_settings(GEOCODE_NOMINATIM_URL=url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_concurrent_callers_share_one_upstream_request(self):
+        workers = 16
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def target(i):
+            barrier.wait()
+            # Slightly different points inside the same geohash cell.
+            results.append(geocoding.reverse_geocode_cached(12.97160 + i * 1e-6, 77.59460))
+
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(StubNominatim.hits, 1)
+        self.assertEqual(results, [{"display_name": "Stub"}] * workers)
+        self.assertEqual(geocoding.stats.snapshot()["misses"], 1)
+
+
+class KDTreeTests(SimpleTestCase):
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(7)
+        points = [(rng.uniform(-100, 100), rng.uniform(-100, 100)) for _ in range(500)]
+        tree = gazetteer.KDTree(points, list(range(len(points))))
+
+        for _ in range(200):
+            query = (rng.uniform(-110, 110), rng.uniform(-110, 110))
+            expected = min(
+                range(len(points)),
+                key=lambda i: (points[i][0] - query[0]) ** 2 + (points[i][1] - query[1]) ** 2,
+            )
+            self.assertEqual(tree.nearest(query)[0], expected)
+
+    def test_empty_tree(self):
+        self.assertEqual(gazetteer.KDTree([], []).nearest((0, 0))[0], None)
+
+
+class GazetteerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        geocoding.local_cache.clear()
+        geocoding.stats.reset()
+        gazetteer.index.invalidate()
+        self.addCleanup(gazetteer.index.invalidate)
+
+        handle, self.csv_path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as csv_file:
+            csv_file.write(
+                "name,ward,city,state,postcode,latitude,longitude\n"
+                "Shivajinagar,Ward 92,Bengaluru,Karnataka,560001,12.9857,77.6057\n"
+                "Koramangala,Ward 151,Bengaluru,Karnataka,560034,12.9352,77.6245\n"
+            )
+        self.addCleanup(os.remove, self.csv_path)
+        self.load()
+
+    def load(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("load_gazetteer", self.csv_path, stdout=open(os.devnull, "w"))
+
+    def test_nearby_point_is_answered_offline(self):
+        with mock.patch("report_hub.geocoding.fetch_reverse") as fetch:
+            response = APIClient().get("/reverse-geocode/", {"lat": 12.936, "lon": 77.625})
+
+        fetch.assert_not_called()
+        self.assertEqual(response.data["address"]["suburb"], "Koramangala")
+        self.assertTrue(response.data["display_name"].startswith("Koramangala, Ward 151"))
+        self.assertEqual(geocoding.stats.snapshot()["gazetteer_hits"], 1)
+
+    def test_far_point_falls_back_to_nominatim(self):
+        with mock.patch("report_hub.geocoding.fetch_reverse") as fetch:
+            fetch.return_value = {"display_name": "Mysuru"}
+            response = APIClient().get("/reverse-geocode/", {"lat": 12.2958, "lon": 76.6394})
+
+        self.assertEqual(response.data["display_name"], "Mysuru")
+
+    def test_reload_replaces_localities(self):
+        gazetteer.index.nearest(12.9, 77.6)
+        with open(self.csv_path, "w") as csv_file:
+            csv_file.write("name,latitude,longitude\nMysuru Palace,12.3052,76.6552\n")
+        self.load()
+
+        self.assertEqual(Locality.objects.count(), 1)
+        row, distance_km = gazetteer.index.nearest(12.3052, 76.6552)
+        self.assertEqual(row[2], "Mysuru Palace")
+        self.assertLess(distance_km, 0.01)
+
+
+@override_settings(THROTTLE_RATES={"auth": "10/min", "presign": "2/min", "report_create": "1/min"})
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        throttling.previous_counts.clear()
+        self.factory = APIRequestFactory()
+
+    def hit(self, throttle_class, now, request=None):
+        throttle = throttle_class()
+        throttle.timer = lambda: now
+        request = request or self.factory.post("/", REMOTE_ADDR="10.0.0.1")
+        return throttle, throttle.allow_request(request, None)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(10):
+            self.assertTrue(self.hit(throttling.AuthThrottle, 30)[1])
+        self.assertFalse(self.hit(throttling.AuthThrottle, 59)[1])
+
+        # A quarter into the next window, 3/4 of the previous 11 still count.
+        self.assertTrue(self.hit(throttling.AuthThrottle, 75)[1])
+        throttle, allowed = self.hit(throttling.AuthThrottle, 75)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 60 * (1 - 8 / 11) - 15)
+
+        self.assertTrue(self.hit(throttling.AuthThrottle, 115)[1])
+
+    def test_clients_are_counted_separately(self):
+        alice = mock.Mock(user=mock.Mock(is_authenticated=True, pk=1), method="POST")
+        bob = mock.Mock(user=mock.Mock(is_authenticated=True, pk=2), method="POST")
+        for _ in range(2):
+            self.assertTrue(self.hit(throttling.PresignThrottle, 0, alice)[1])
+        self.assertFalse(self.hit(throttling.PresignThrottle, 0, alice)[1])
+        self.assertTrue(self.hit(throttling.PresignThrottle, 0, bob)[1])
+
+    def test_method_filter(self):
+        get = self.factory.get("/", REMOTE_ADDR="10.0.0.1")
+        get.user = None
+        for _ in range(3):
+            self.assertTrue(self.hit(throttling.ReportCreateThrottle, 0, get)[1])
+
+    def test_spoofed_forwarded_for_does_not_reset_the_limit(self):
+        rates = {"auth": "2/min"}
+        with override_settings(REST_FRAMEWORK={"NUM_PROXIES": 0}, THROTTLE_RATES=rates):
+            allowed = [
+                self.hit(throttling.AuthThrottle, 0, self.factory.post(
+                    "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=f"192.0.2.{n}"
+                ))[1]
+                for n in range(3)
+            ]
+        self.assertEqual(allowed, [True, True, False])
+
+    def test_concurrent_first_requests_are_all_counted(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+        counts = []
+
+        def target():
+            barrier.wait()
+            counts.append(throttling.AuthThrottle()._incr("throttle:test", 60))
+
+        threads = [threading.Thread(target=target) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(counts), list(range(1, workers + 1)))
+
+    def test_endpoint_returns_retry_after(self):
+        client = APIClient()
+        credentials = {"email": "nobody@example.com", "password": "wrong"}
+        with override_settings(THROTTLE_RATES={"auth": "2/min"}):
+            statuses = [client.post("/api/users/login/", credentials).status_code for _ in range(3)]
+            response = client.post("/api/users/login/", credentials)
+
+        self.assertEqual(statuses[-1], 429)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
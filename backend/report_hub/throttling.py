@@ -0,0 +1,157 @@
+"""
+Cache-backed sliding-window rate limiting for DRF views.
+
+Each client has a counter per fixed window, and the request rate is
+estimated as the current window's count plus the previous window's count
+weighted by how much of it still overlaps the sliding window. The current
+window's counter is created with cache.add, which is atomic on every
+backend, and then bumped with incr, so concurrent first requests cannot
+reset each other's counts. The previous window's count can no longer
+change, so every process remembers it after reading it once.
+
+Client IPs come from DRF's get_ident, which only trusts X-Forwarded-For
+for the proxies counted in REST_FRAMEWORK["NUM_PROXIES"].
+
+Rates live in settings.THROTTLE_RATES as "<count>/<period>" (s, m, h, d),
+keyed by scope; a scope whose rate is None is not throttled.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+PREVIOUS_COUNTS_SIZE = 10_000
+
+
+def parse_rate(rate):
+    """"5/min" -> (5, 60); None -> (None, None)."""
+    if rate is None:
+        return None, None
+    count, period = rate.split("/")
+    return int(count), PERIODS[period[0]]
+
+
+class _PreviousCounts:
+    """Per-process LRU of finished windows' counts."""
+
+    def __init__(self, max_size=PREVIOUS_COUNTS_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            count = self._entries.get(key)
+            if count is not None:
+                self._entries.move_to_end(key)
+            return count
+
+    def set(self, key, count):
+        with self._lock:
+            self._entries[key] = count
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+previous_counts = _PreviousCounts()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base class: subclasses set `scope` and may restrict `methods`. Requests
+    are keyed per user when authenticated and per client IP otherwise.
+    Rejected requests still count, so a client that keeps hammering stays
+    limited.
+    """
+
+    scope = None
+    methods = None
+    timer = time.time
+
+    def get_rate(self):
+        return getattr(settings, "THROTTLE_RATES", {}).get(self.scope)
+
+    def get_cache_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def _incr(self, key, duration):
+        cache.add(key, 0, timeout=duration * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # The counter expired between add and incr; start it again.
+            if cache.add(key, 1, timeout=duration * 2):
+                return 1
+            return cache.incr(key)
+
+    def _previous_count(self, key):
+        count = previous_counts.get(key)
+        if count is None:
+            count = cache.get(key, 0)
+            previous_counts.set(key, count)
+        return count
+
+    def allow_request(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        self.num_requests, self.duration = parse_rate(self.get_rate())
+        if self.num_requests is None:
+            return True
+
+        now = self.timer()
+        window, offset = divmod(now, self.duration)
+        prefix = f"throttle:{self.scope}:{self.get_cache_ident(request)}"
+        self.count = self._incr(f"{prefix}:{int(window)}", self.duration)
+        self.previous = self._previous_count(f"{prefix}:{int(window) - 1}")
+        self.elapsed = offset / self.duration
+
+        estimate = self.previous * (1 - self.elapsed) + self.count
+        return estimate <= self.num_requests
+
+    def wait(self):
+        """Seconds until the estimate falls back under the limit."""
+        remaining = (1 - self.elapsed) * self.duration
+        if self.count > self.num_requests:
+            return remaining
+        # Solve previous * (1 - f) + count <= limit for the window fraction f.
+        needed = 1 - (self.num_requests - self.count) / self.previous
+        return max(0.0, (needed - self.elapsed) * self.duration)
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    """Always keyed by client IP, e.g. for login endpoints."""
+
+    def get_cache_ident(self, request):
+        return f"ip:{self.get_ident(request)}"
+
+
+class AuthThrottle(IPSlidingWindowThrottle):
+    scope = "auth"
+
+
+class GeocodeBatchThrottle(SlidingWindowThrottle):
+    scope = "geocode_batch"
+
+
+class OTPRequestThrottle(IPSlidingWindowThrottle):
+    scope = "otp_request"
+
+
+class PresignThrottle(SlidingWindowThrottle):
+    scope = "presign"
+
+
+class ReportCreateThrottle(SlidingWindowThrottle):
+    scope = "report_create"
+    methods = ("POST",)
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from report.views import PublicIssueReportDetailView
 from django.conf import settings
-from report_hub.views import health_check, reverse_geocode
+from report_hub.views import health_check, reverse_geocode, reverse_geocode_batch, reverse_geocode_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,6 +15,8 @@ urlpatterns = [
          PublicIssueReportDetailView.as_view(), 
          name='report-detail'),
     path("reverse-geocode/", reverse_geocode, name="reverse-geocode"),
+    path("reverse-geocode/batch/", reverse_geocode_batch, name="reverse-geocode-batch"),
+    path("reverse-geocode/stats/", reverse_geocode_stats, name="reverse-geocode-stats"),
 ]
 
 urlpatterns.append(
@@ -4,10 +4,14 @@ from rest_framework.decorators import permission_classes
 
 def health_check(request):
     return JsonResponse({"status": "ok"})
-import requests
-from rest_framework.decorators import api_view
+from django.conf import settings
+from rest_framework.decorators import api_view, throttle_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from report_hub.geocoding import GeocodingError, reverse_geocode_cached, reverse_geocode_many
+from report_hub.geocoding import stats as geocode_stats
+from report_hub.throttling import GeocodeBatchThrottle
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
@@ -21,23 +25,77 @@ def reverse_geocode(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    url = "https://nominatim.openstreetmap.org/reverse"
-    params = {
-        "format": "jsonv2",
-        "lat": lat,
-        "lon": lon,
-        "accept-language": "en",
-    }
-    headers = {
-        "User-Agent": "ReportMitra/1.0 (contact@reportmitra.in)"
-    }
+    try:
+        lat, lon = float(lat), float(lon)
+    except ValueError:
+        return Response(
+            {"error": "lat and lon must be numbers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return Response(
+            {"error": "lat and lon are out of range"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
     try:
-        res = requests.get(url, params=params, headers=headers, timeout=5)
-        res.raise_for_status()
-        return Response(res.json())
-    except requests.RequestException:
+        return Response(reverse_geocode_cached(lat, lon))
+    except GeocodingError:
         return Response(
             {"error": "Reverse geocoding failed"},
             status=status.HTTP_502_BAD_GATEWAY
         )
+
+
+def _parse_point(point):
+    if not isinstance(point, dict):
+        return None
+    try:
+        lat, lon = float(point["lat"]), float(point["lon"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@throttle_classes([GeocodeBatchThrottle])
+def reverse_geocode_batch(request):
+    """
+    Reverse geocode many points in one call.
+    Body: {"points": [{"lat": 12.97, "lon": 77.59}, ...]}
+    Returns results in request order; failed points get an error entry.
+    """
+    points = request.data.get("points")
+    max_items = getattr(settings, "GEOCODE_BATCH_MAX_ITEMS", 20)
+    if not isinstance(points, list) or not points or len(points) > max_items:
+        return Response(
+            {"error": f"points must be a list of 1 to {max_items} coordinates"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    parsed = [_parse_point(point) for point in points]
+    valid = [point for point in parsed if point is not None]
+    resolved = iter(reverse_geocode_many(valid))
+
+    results = []
+    for point, coords in zip(points, parsed):
+        if coords is None:
+            results.append({"point": point, "error": "Invalid lat/lon"})
+            continue
+        lat, lon = coords
+        value = next(resolved)
+        if isinstance(value, GeocodingError):
+            results.append({"lat": lat, "lon": lon, "error": "Reverse geocoding failed"})
+        else:
+            results.append({"lat": lat, "lon": lon, "result": value})
+
+    return Response({"results": results})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def reverse_geocode_stats(request):
+    return Response(geocode_stats.snapshot())
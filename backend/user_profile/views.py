@@ -3,8 +3,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from user_profile.models import UserProfile
 from user_profile.serializers import UserProfileSerializer
+from users.cache import get_user_profile
 from users.services import evaluate_resolution_incentive
 
 @api_view(["GET"])
@@ -13,7 +13,7 @@ def user_profile(request):
     """
     Return the logged-in user's profile, including linked Aadhaar data (if any).
     """
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = get_user_profile(request.user)
     serializer = UserProfileSerializer(profile)
     incentive_data = evaluate_resolution_incentive(request.user)
     response_data = serializer.data
@@ -0,0 +1,217 @@
+"""
+Fast refresh-token blacklist checks.
+
+simplejwt checks BlacklistedToken on every refresh. This module keeps a
+Bloom filter of the JTIs of unexpired blacklisted tokens per process,
+rebuilt every JWT_BLACKLIST_BLOOM_REFRESH_SECONDS. A JTI the filter does
+not contain cannot have been blacklisted before the last rebuild. Tokens
+blacklisted since then are also written to the shared cache for longer
+than one rebuild interval, so the common "not blacklisted" answer costs a
+filter lookup and one cache get instead of a query. A filter hit (a real
+blacklisted token or a rare false positive) is confirmed in the database.
+
+Every newly created BlacklistedToken row, from logout or from rotation, is
+recorded through a post_save signal (see users.signals). Without a shared
+cache (JWT_BLACKLIST_BLOOM_ENABLED off) checks go to the database as before.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .cache import get_cached_user
+
+MIN_CAPACITY = 10_000
+BUILD_CHUNK_SIZE = 10_000
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+def _refresh_seconds():
+    return getattr(settings, "JWT_BLACKLIST_BLOOM_REFRESH_SECONDS", 300)
+
+
+def _recent_key(jti):
+    return f"jwt:blacklisted:{jti}"
+
+
+class BlacklistFilter:
+    """Per-process Bloom filter of blacklisted JTIs, rebuilt periodically."""
+
+    def __init__(self):
+        self._filter = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _build(self):
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        bloom = BloomFilter(
+            max(MIN_CAPACITY, rows.count() * 2),
+            getattr(settings, "JWT_BLACKLIST_BLOOM_ERROR_RATE", 0.001),
+        )
+        for jti in rows.values_list("token__jti", flat=True).iterator(chunk_size=BUILD_CHUNK_SIZE):
+            bloom.add(jti)
+        return bloom
+
+    def get(self):
+        now = time.monotonic()
+        if self._filter is not None and now - self._built_at < _refresh_seconds():
+            return self._filter
+        # While one thread rebuilds, the others keep using the old filter.
+        if not self._lock.acquire(blocking=self._filter is None):
+            return self._filter
+        try:
+            if self._filter is None or now - self._built_at >= _refresh_seconds():
+                self._filter = self._build()
+                self._built_at = time.monotonic()
+            return self._filter
+        finally:
+            self._lock.release()
+
+    def add(self, jti):
+        bloom = self._filter
+        if bloom is not None:
+            bloom.add(jti)
+
+    def invalidate(self):
+        with self._lock:
+            self._filter = None
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def bloom_enabled():
+    return getattr(settings, "JWT_BLACKLIST_BLOOM_ENABLED", False)
+
+
+def record_blacklisted(jti):
+    blacklist_filter.add(jti)
+    if bloom_enabled():
+        cache.set(_recent_key(jti), 1, timeout=_refresh_seconds() * 2 + 60)
+
+
+def is_blacklisted(jti):
+    if bloom_enabled() and jti not in blacklist_filter.get():
+        return cache.get(_recent_key(jti)) is not None
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+class FastBlacklistRefreshToken(RefreshToken):
+    """
+    RefreshToken whose blacklist check goes through is_blacklisted() and
+    whose outstanding-token rows are created with the cached user instead
+    of a fresh user query.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self):
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        return OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                "user": get_cached_user(user_id) if user_id else None,
+                "created_at": self.current_time,
+                "token": str(self),
+                "expires_at": datetime_from_epoch(self.payload["exp"]),
+            },
+        )
+
+    def blacklist(self):
+        token, _ = self.outstand()
+        return BlacklistedToken.objects.get_or_create(token=token)
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """TokenRefreshSerializer using the fast blacklist check and cached users."""
+
+    token_class = FastBlacklistRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            user = get_cached_user(user_id)
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(
+                    self.error_messages["no_active_account"],
+                    "no_active_account",
+                )
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+def prune_expired_tokens(batch_size=5000):
+    """
+    Delete expired outstanding tokens (and their blacklist rows) in batches
+    so no single statement locks a large part of the tables. Returns the
+    number of outstanding tokens deleted.
+    """
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
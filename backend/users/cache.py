@@ -0,0 +1,77 @@
+"""
+Cached identity for authenticated requests.
+
+The user row, with its profile attached, is cached per user id under a key
+that includes a version stamp. Saving or deleting a CustomUser or
+UserProfile bumps the stamp (see users.signals), so stale entries simply
+stop being addressed. Code that changes users with queryset update() or
+bulk_update() fires no signals and must call bump_identity_version itself.
+
+Caching is only safe when every worker sees the same version stamp, so it
+is off (AUTH_USER_CACHE_TIMEOUT = 0) unless there is a shared cache. With
+per-process LocMem a ban saved by one worker would not reach the others.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _version_key(user_id):
+    return f"auth:user:{user_id}:version"
+
+
+def get_identity_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_identity_version(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.add(_version_key(user_id), 2, timeout=None)
+
+
+def identity_timeout():
+    return getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 300)
+
+
+def _attach_profile(user, profile):
+    # Fill the reverse one-to-one cache so user.user_profile costs no query.
+    user._state.fields_cache["user_profile"] = profile
+
+
+def get_cached_user(user_id):
+    """The user with its profile attached, or None if no such user exists."""
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    if identity_timeout() <= 0:
+        return user_model.objects.filter(pk=user_id).select_related("user_profile").first()
+
+    key = f"auth:user:{user_id}:v{get_identity_version(user_id)}"
+    user = cache.get(key)
+    if user is not None:
+        return user
+
+    user = user_model.objects.filter(pk=user_id).select_related("user_profile").first()
+    if user is None:
+        return None
+    cache.set(key, user, timeout=identity_timeout())
+    return user
+
+
+def get_user_profile(user):
+    """
+    The user's profile, created if missing. Uses the profile cached with
+    the authenticated user when there is one.
+    """
+    profile = user._state.fields_cache.get("user_profile")
+    if profile is None:
+        profile_model = apps.get_model("user_profile", "UserProfile")
+        profile, _ = profile_model.objects.get_or_create(user=user)
+        _attach_profile(user, profile)
+    return profile
@@ -0,0 +1,132 @@
+"""
+Google ID token verification without a network round trip per sign-in.
+
+Google's signing certificates are fetched over a pooled session and kept
+for as long as the response's Cache-Control max-age allows (refetched early
+only when a token names an unknown key id). Tokens are verified locally in
+one pass against every configured client ID, and tokens that already
+verified are remembered by hash until shortly before they expire.
+"""
+
+import hashlib
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from google.auth import jwt
+
+from report_hub.cache import LocalTTLCache
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+DEFAULT_CERTS_MAX_AGE = 60 * 60
+MIN_REFETCH_INTERVAL = 60
+CLOCK_SKEW_SECONDS = 10
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenError(ValueError):
+    pass
+
+
+def _max_age(response):
+    match = MAX_AGE.search(response.headers.get("Cache-Control", ""))
+    if not match:
+        return DEFAULT_CERTS_MAX_AGE
+    age = int(response.headers.get("Age", 0) or 0)
+    return max(0, int(match.group(1)) - age)
+
+
+class GoogleCertCache:
+    def __init__(self, url=GOOGLE_CERTS_URL):
+        self.url = url
+        self._certs = None
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+
+    def _fetch(self):
+        response = self._session.get(self.url, timeout=5)
+        response.raise_for_status()
+        now = time.monotonic()
+        self._certs = response.json()
+        self._expires_at = now + _max_age(response)
+        self._fetched_at = now
+
+    def get(self, kid=None):
+        """
+        Current certificates; refetched when expired, or when `kid` is not
+        among them and the last fetch is more than a minute old.
+        """
+        with self._lock:
+            now = time.monotonic()
+            stale = self._certs is None or now >= self._expires_at
+            unknown_kid = (
+                kid is not None
+                and self._certs is not None
+                and kid not in self._certs
+                and now - self._fetched_at >= MIN_REFETCH_INTERVAL
+            )
+            if stale or unknown_kid:
+                try:
+                    self._fetch()
+                except (requests.RequestException, ValueError):
+                    if self._certs is None:
+                        raise
+                    # Keep serving the previous certificates if Google is unreachable.
+            return self._certs
+
+    def clear(self):
+        with self._lock:
+            self._certs = None
+            self._expires_at = 0.0
+            self._fetched_at = 0.0
+
+
+certs = GoogleCertCache()
+verified_tokens = LocalTTLCache(1024)
+
+
+def _client_ids():
+    return [
+        client_id
+        for client_id in (
+            getattr(settings, "GOOGLE_CLIENT_ID", ""),
+            getattr(settings, "GOOGLE_CLIENT_ID_APP", ""),
+        )
+        if client_id
+    ]
+
+
+def verify_google_id_token(token):
+    """Return the verified claims of a Google ID token or raise GoogleTokenError."""
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    claims = verified_tokens.get(token_hash)
+    if claims is not None:
+        return claims
+
+    try:
+        header = jwt.decode_header(token)
+        certificates = certs.get(header.get("kid"))
+        claims = jwt.decode(
+            token,
+            certs=certificates,
+            audience=_client_ids(),
+            clock_skew_in_seconds=CLOCK_SKEW_SECONDS,
+        )
+    except (requests.RequestException, ValueError) as e:
+        raise GoogleTokenError(str(e)) from e
+
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise GoogleTokenError(f"Wrong issuer: {claims.get('iss')}")
+
+    ttl = min(
+        getattr(settings, "GOOGLE_TOKEN_MEMO_TTL", 300),
+        claims["exp"] - time.time() - CLOCK_SKEW_SECONDS,
+    )
+    if ttl > 0:
+        verified_tokens.set(token_hash, claims, ttl)
+    return claims
@@ -0,0 +1,113 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import CustomUser, TrustScoreLog
+from users.services import calculate_deactivation_days, days_since_last_violation
+
+EMAIL_PREFIX = "deactivation-benchmark-"
+
+
+def _fk_index_name():
+    """The plain user_id index, i.e. what a lookup had before the composite one."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, TrustScoreLog._meta.db_table
+        )
+    for name, info in constraints.items():
+        if info["index"] and info["columns"] == ["user_id"]:
+            return name
+    return None
+
+
+class Command(BaseCommand):
+    help = "Measure ban-length computation cost as the TrustScoreLog grows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--volumes",
+            default="10000,100000,500000",
+            help="Comma-separated FAKE_REPORT log counts to measure at",
+        )
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--lookups", type=int, default=500)
+        parser.add_argument("--cleanup", action="store_true")
+
+    def _users(self, count):
+        now = timezone.now()
+        existing = CustomUser.objects.filter(email__startswith=EMAIL_PREFIX).count()
+        CustomUser.objects.bulk_create(
+            CustomUser(
+                email=f"{EMAIL_PREFIX}{n}@example.com",
+                username=f"{EMAIL_PREFIX}{n}",
+                last_violation_at=now,
+            )
+            for n in range(existing, count)
+        )
+        return list(
+            CustomUser.objects.filter(email__startswith=EMAIL_PREFIX)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:count]
+        )
+
+    def _seed(self, user_ids, target):
+        existing = TrustScoreLog.objects.filter(user_id__in=user_ids).count()
+        for start in range(existing, target, 10_000):
+            TrustScoreLog.objects.bulk_create(
+                TrustScoreLog(
+                    user_id=user_ids[n % len(user_ids)],
+                    delta=-1,
+                    reason=TrustScoreLog.REASON_FAKE_REPORT,
+                )
+                for n in range(start, min(target, start + 10_000))
+            )
+
+    def _time(self, label, lookup, user_ids, lookups):
+        started = time.perf_counter()
+        for n in range(lookups):
+            calculate_deactivation_days(lookup(user_ids[n % len(user_ids)]))
+        per_call = (time.perf_counter() - started) / lookups * 1_000_000
+        self.stdout.write(f"  {label:<20} {per_call:8.1f} us/ban")
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            deleted, _ = CustomUser.objects.filter(email__startswith=EMAIL_PREFIX).delete()
+            self.stdout.write(f"Deleted {deleted} rows")
+            return
+
+        user_ids = self._users(options["users"])
+        lookups = options["lookups"]
+        fk_index = _fk_index_name() if connection.vendor == "sqlite" else None
+        table = TrustScoreLog._meta.db_table
+
+        def log_scan(user_id):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT MAX(created_at) FROM "{table}" INDEXED BY "{fk_index}" '
+                    "WHERE user_id = %s AND reason = %s",
+                    [user_id, TrustScoreLog.REASON_FAKE_REPORT],
+                )
+                # Raw SQLite returns text; only the lookup cost matters here.
+                return 0 if cursor.fetchone()[0] else None
+
+        def composite_index(user_id):
+            last = TrustScoreLog.objects.filter(
+                user_id=user_id, reason=TrustScoreLog.REASON_FAKE_REPORT
+            ).aggregate(last=Max("created_at"))["last"]
+            return last and (timezone.now() - last).days
+
+        def denormalized(user_id):
+            # process_fake_report already holds the locked user row.
+            user = CustomUser.objects.only("last_violation_at").get(pk=user_id)
+            return days_since_last_violation(user)
+
+        for volume in (int(v) for v in options["volumes"].split(",")):
+            self._seed(user_ids, volume)
+            self.stdout.write(f"{volume} FAKE_REPORT logs over {len(user_ids)} users")
+            if fk_index:
+                self._time("user_id index scan", log_scan, user_ids, lookups)
+            self._time("composite index", composite_index, user_ids, lookups)
+            self._time("last_violation_at", denormalized, user_ids, lookups)
@@ -0,0 +1,74 @@
+import statistics
+import threading
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import AnonRateThrottle
+
+from report_hub import throttling
+
+
+class _SlidingWindow(throttling.IPSlidingWindowThrottle):
+    scope = "benchmark"
+
+    def get_rate(self):
+        return "1000000/min"
+
+
+class _DRFAnon(AnonRateThrottle):
+    """DRF's history-list throttle: a get and a set of the full list per request."""
+
+    rate = "1000000/min"
+
+
+class Command(BaseCommand):
+    help = "Measure per-request overhead of the sliding-window throttle under load"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per thread")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--clients", type=int, default=50, help="Distinct client IPs")
+
+    def _measure(self, label, throttle_class, requests, threads, clients):
+        cache.clear()
+        throttling.previous_counts.clear()
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(threads)
+        timings = []
+        lock = threading.Lock()
+
+        def worker(offset):
+            local = []
+            barrier.wait()
+            for i in range(requests):
+                request = factory.post("/", REMOTE_ADDR=f"10.0.{(offset + i) % clients}.1")
+                request.user = AnonymousUser()
+                started = time.perf_counter()
+                throttle_class().allow_request(request, None)
+                local.append((time.perf_counter() - started) * 1_000_000)
+            with lock:
+                timings.extend(local)
+
+        started_all = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        total = time.perf_counter() - started_all
+
+        timings.sort()
+        self.stdout.write(
+            f"{label:<16} mean {statistics.mean(timings):8.1f} us   "
+            f"p99 {timings[int(len(timings) * 0.99) - 1]:8.1f} us   "
+            f"{len(timings) / total:10.0f} req/s"
+        )
+
+    def handle(self, *args, **options):
+        args = options["requests"], options["threads"], options["clients"]
+        self.stdout.write(f"cache backend: {caches['default'].__class__.__name__}")
+        self._measure("drf anon", _DRFAnon, *args)
+        self._measure("sliding window", _SlidingWindow, *args)
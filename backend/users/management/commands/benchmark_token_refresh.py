@@ -0,0 +1,82 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.blacklist import CachedTokenRefreshSerializer, blacklist_filter
+from users.models import CustomUser
+
+SEED_PREFIX = "bench-"
+BENCH_EMAIL = "token-refresh-benchmark@example.com"
+
+
+class Command(BaseCommand):
+    help = "Measure token refresh throughput against a large blacklist table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Blacklisted rows to add first")
+        parser.add_argument("--refreshes", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--cleanup", action="store_true", help="Delete seeded rows and exit")
+
+    def _seed(self, user, count, batch_size):
+        expires_at = timezone.now() + timedelta(days=7)
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            tokens = OutstandingToken.objects.bulk_create(
+                OutstandingToken(
+                    user=user,
+                    jti=f"{SEED_PREFIX}{uuid.uuid4().hex}",
+                    token="",
+                    created_at=timezone.now(),
+                    expires_at=expires_at,
+                )
+                for _ in range(size)
+            )
+            if not all(token.pk for token in tokens):
+                tokens = OutstandingToken.objects.filter(
+                    jti__startswith=SEED_PREFIX, blacklistedtoken__isnull=True
+                )
+            BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in tokens)
+            self.stdout.write(f"seeded {start + size}/{count}")
+
+    def _measure(self, label, serializer_class, user, refreshes):
+        tokens = [str(RefreshToken.for_user(user)) for _ in range(refreshes)]
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for token in tokens:
+                serializer = serializer_class(data={"refresh": token})
+                serializer.is_valid(raise_exception=True)
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{label:<12} {refreshes / elapsed:8.1f} refresh/s   "
+            f"{elapsed / refreshes * 1000:7.2f} ms each   "
+            f"{len(queries) / refreshes:5.1f} queries each"
+        )
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            deleted, _ = OutstandingToken.objects.filter(jti__startswith=SEED_PREFIX).delete()
+            CustomUser.objects.filter(email=BENCH_EMAIL).delete()
+            self.stdout.write(f"Deleted {deleted} rows")
+            return
+
+        user, _ = CustomUser.objects.get_or_create(email=BENCH_EMAIL, defaults={"username": None})
+        if options["seed"]:
+            self._seed(user, options["seed"], options["batch_size"])
+        self.stdout.write(f"blacklisted rows: {BlacklistedToken.objects.count()}")
+
+        refreshes = options["refreshes"]
+        self._measure("stock", TokenRefreshSerializer, user, refreshes)
+        with override_settings(JWT_BLACKLIST_BLOOM_ENABLED=True):
+            blacklist_filter.invalidate()
+            blacklist_filter.get()
+            self._measure("bloom", CachedTokenRefreshSerializer, user, refreshes)
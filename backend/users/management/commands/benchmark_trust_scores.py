@@ -0,0 +1,70 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.models import CustomUser, TrustScoreLog
+from users.services import apply_trust_score_change, apply_trust_score_changes
+
+EMAIL_PREFIX = "trust-benchmark-"
+REASONS = [
+    (TrustScoreLog.REASON_FAKE_REPORT, -10),
+    (TrustScoreLog.REASON_ISSUE_RESOLVED, 2),
+    (TrustScoreLog.REASON_APPEAL_ACCEPTED, 5),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare per-call and bulk trust score updates on a moderation batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--adjustments", type=int, default=10_000)
+        parser.add_argument("--users", type=int, default=2_000)
+        parser.add_argument("--skip-single", action="store_true")
+
+    def _users(self, count):
+        existing = CustomUser.objects.filter(email__startswith=EMAIL_PREFIX).count()
+        CustomUser.objects.bulk_create(
+            CustomUser(email=f"{EMAIL_PREFIX}{n}@example.com", username=f"{EMAIL_PREFIX}{n}")
+            for n in range(existing, count)
+        )
+        return list(
+            CustomUser.objects.filter(email__startswith=EMAIL_PREFIX).order_by("pk")[:count]
+        )
+
+    def _measure(self, label, func):
+        # Each run is rolled back so both see the same starting state.
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                func()
+                elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(f"{label:<8} {elapsed * 1000:10.1f} ms")
+
+    def handle(self, *args, **options):
+        users = self._users(options["users"])
+        rng = random.Random(0)
+        batch = [
+            (rng.choice(users), delta, reason, None)
+            for reason, delta in (rng.choice(REASONS) for _ in range(options["adjustments"]))
+        ]
+        self.stdout.write(f"{len(batch)} adjustments across {len(users)} users")
+
+        if not options["skip_single"]:
+            def single():
+                for user, delta, reason, report in batch:
+                    apply_trust_score_change(user=user, delta=delta, reason=reason, report=report)
+
+            self._measure("single", single)
+            for user in users:
+                user.refresh_from_db()
+
+        self._measure("bulk", lambda: apply_trust_score_changes(batch))
@@ -0,0 +1,173 @@
+import json
+import os
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users.cache import bump_identity_version
+from users.models import CustomUser, TrustScoreLog
+
+MIN_SCORE = 0
+MAX_SCORE = 110
+
+
+def replay(deltas, initial):
+    """Apply logged deltas in order with the same clamping as the services."""
+    score = initial
+    for delta in deltas:
+        score = max(MIN_SCORE, min(MAX_SCORE, score + delta))
+    return score
+
+
+def ledger_scores(users_filter, chunk_size):
+    """Yield (user_id, replayed score) for each user with log rows, in user order."""
+    initial = CustomUser._meta.get_field("trust_score").default
+    logs = (
+        TrustScoreLog.objects.filter(**users_filter)
+        .order_by("user_id", "created_at", "pk")
+        .values_list("user_id", "delta")
+        .iterator(chunk_size=chunk_size)
+    )
+    for user_id, rows in groupby(logs, key=itemgetter(0)):
+        yield user_id, replay((delta for _, delta in rows), initial)
+
+
+class Command(BaseCommand):
+    help = "Replay TrustScoreLog and verify (or repair) CustomUser.trust_score"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Write the replayed score to users whose stored score drifted",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of users checked (and repaired) per batch",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Log rows fetched per round trip while streaming",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="JSON file recording progress after every batch",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue after the last user recorded in --checkpoint",
+        )
+        parser.add_argument(
+            "--show",
+            type=int,
+            default=50,
+            help="Print at most this many mismatches",
+        )
+
+    def _load_checkpoint(self, path):
+        if not path or not os.path.exists(path):
+            raise CommandError("--resume needs an existing --checkpoint file")
+        with open(path) as fh:
+            return json.load(fh)
+
+    def _save_checkpoint(self, path, state):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, path)
+
+    def _repair(self, user_ids, chunk_size):
+        """Recompute under row locks so writes racing the scan are not lost."""
+        with transaction.atomic():
+            locked = {
+                pk: stored
+                for pk, stored in CustomUser.objects.select_for_update()
+                .filter(pk__in=user_ids)
+                .values_list("pk", "trust_score")
+            }
+            initial = CustomUser._meta.get_field("trust_score").default
+            expected = dict.fromkeys(locked, initial)
+            expected.update(ledger_scores({"user_id__in": user_ids}, chunk_size))
+
+            stale = [
+                CustomUser(pk=pk, trust_score=expected[pk])
+                for pk, stored in locked.items()
+                if stored != expected[pk]
+            ]
+            CustomUser.objects.bulk_update(stale, ["trust_score"])
+            # bulk_update fires no signals; drop cached identities now and
+            # again on commit, as users.signals does.
+            stale_ids = [user.pk for user in stale]
+            for pk in stale_ids:
+                bump_identity_version(pk)
+            transaction.on_commit(
+                lambda: [bump_identity_version(pk) for pk in stale_ids]
+            )
+        return len(stale)
+
+    def handle(self, *args, **options):
+        repair = options["repair"]
+        batch_size = options["batch_size"]
+        chunk_size = options["chunk_size"]
+        checkpoint = options["checkpoint"]
+
+        state = {"last_user_id": 0, "checked": 0, "mismatched": 0, "repaired": 0}
+        if options["resume"]:
+            state.update(self._load_checkpoint(checkpoint))
+            self.stdout.write(f"Resuming after user {state['last_user_id']}")
+
+        initial = CustomUser._meta.get_field("trust_score").default
+        shown = 0
+
+        while True:
+            users = list(
+                CustomUser.objects.filter(pk__gt=state["last_user_id"])
+                .order_by("pk")
+                .values_list("pk", "trust_score")[:batch_size]
+            )
+            if not users:
+                break
+            first_id, last_id = users[0][0], users[-1][0]
+
+            # Both sides are ordered by user id, so merge them one log group
+            # at a time; memory stays bounded by the batch, not the ledger.
+            ledger = ledger_scores(
+                {"user_id__gte": first_id, "user_id__lte": last_id}, chunk_size
+            )
+            entry = next(ledger, None)
+            mismatched = []
+            for user_id, stored in users:
+                while entry is not None and entry[0] < user_id:
+                    entry = next(ledger, None)
+                expected = initial
+                if entry is not None and entry[0] == user_id:
+                    expected = entry[1]
+                if stored != expected:
+                    mismatched.append(user_id)
+                    if shown < options["show"]:
+                        self.stdout.write(
+                            f"user {user_id}: stored={stored} ledger={expected}"
+                        )
+                        shown += 1
+            # Release the log cursor before writing.
+            ledger.close()
+
+            state["checked"] += len(users)
+            state["mismatched"] += len(mismatched)
+            if repair and mismatched:
+                state["repaired"] += self._repair(mismatched, chunk_size)
+            state["last_user_id"] = last_id
+            if checkpoint:
+                self._save_checkpoint(checkpoint, state)
+
+        summary = f"Checked {state['checked']} users, {state['mismatched']} mismatched"
+        if repair:
+            summary += f", repaired {state['repaired']}"
+        self.stdout.write(self.style.SUCCESS(summary))
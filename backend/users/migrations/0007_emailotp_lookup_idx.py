@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_customuser_incentive_reward_amount_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['email', 'is_used', 'created_at'], name='emailotp_lookup_idx'),
+        ),
+    ]
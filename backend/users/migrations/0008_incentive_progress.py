@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:19
+
+from django.db import migrations, models
+
+
+def populate_incentive_progress(apps, schema_editor):
+    CustomUser = apps.get_model("users", "CustomUser")
+    IssueReport = apps.get_model("report", "IssueReport")
+
+    reporters = CustomUser.objects.filter(reports__isnull=False).distinct()
+    for user in reporters.iterator(chunk_size=2000):
+        latest_statuses = list(
+            IssueReport.objects.filter(user=user)
+            .order_by("-issue_date")
+            .values_list("status", flat=True)[:6]
+        )
+        user.incentive_latest_reports_checked = len(latest_statuses)
+        user.incentive_latest_resolved_count = latest_statuses.count("resolved")
+        update_fields = [
+            "incentive_latest_reports_checked",
+            "incentive_latest_resolved_count",
+        ]
+        # Users who reached the reward before this change would have been
+        # granted it on their next profile load.
+        if (
+            user.trust_score == 110
+            and user.incentive_latest_resolved_count == 6
+            and not user.incentive_reward_granted
+        ):
+            user.incentive_reward_granted = True
+            user.incentive_reward_amount += 50
+            user.incentive_reward_notified = False
+            update_fields += [
+                "incentive_reward_granted",
+                "incentive_reward_amount",
+                "incentive_reward_notified",
+            ]
+        user.save(update_fields=update_fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_emailotp_lookup_idx'),
+        ('report', '0019_locality'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='incentive_latest_reports_checked',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='incentive_latest_resolved_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='incentive_reward_notified',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(populate_incentive_progress, migrations.RunPython.noop),
+    ]
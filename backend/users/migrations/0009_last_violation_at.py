@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:27
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def populate_last_violation_at(apps, schema_editor):
+    CustomUser = apps.get_model("users", "CustomUser")
+    TrustScoreLog = apps.get_model("users", "TrustScoreLog")
+
+    last_violation = (
+        TrustScoreLog.objects.filter(user=OuterRef("pk"), reason="FAKE_REPORT")
+        .order_by()
+        .values("user")
+        .annotate(last=Max("created_at"))
+        .values("last")
+    )
+    CustomUser.objects.filter(
+        trust_score_logs__reason="FAKE_REPORT"
+    ).distinct().update(last_violation_at=Subquery(last_violation))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report', '0019_locality'),
+        ('users', '0008_incentive_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='last_violation_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='trustscorelog',
+            index=models.Index(fields=['user', 'reason', 'created_at'], name='trustlog_user_reason_idx'),
+        ),
+        migrations.RunPython(populate_last_violation_at, migrations.RunPython.noop),
+    ]
@@ -56,7 +56,11 @@ class CustomUser(AbstractUser):
     )
     incentive_reward_granted = models.BooleanField(default=False)
     incentive_reward_amount = models.PositiveIntegerField(default=0)
+    incentive_reward_notified = models.BooleanField(default=True)
+    incentive_latest_reports_checked = models.PositiveSmallIntegerField(default=0)
+    incentive_latest_resolved_count = models.PositiveSmallIntegerField(default=0)
     deactivated_until = models.DateTimeField(null=True, blank=True)
+    last_violation_at = models.DateTimeField(null=True, blank=True)
     
     AUTH_METHOD_CHOICES = [
         ('email', 'Email/JWT'),
@@ -150,6 +154,12 @@ class TrustScoreLog(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "reason", "created_at"],
+                name="trustlog_user_reason_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email} {self.delta:+d} ({self.reason})"
@@ -164,6 +174,9 @@ class EmailOTP(models.Model):
     is_used = models.BooleanField(default=False)
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["email", "is_used", "created_at"], name="emailotp_lookup_idx"),
+        ]
     
     def __str__(self):
         return f"{self.email} - {self.otp}"
@@ -0,0 +1,136 @@
+"""
+Login OTP storage.
+
+CacheOTPStore keeps only an HMAC of each code in the shared cache with a
+native TTL and a per-email attempt counter, so issuing and verifying a code
+costs no database writes. DatabaseOTPStore uses the EmailOTP table and is
+the fallback when there is no shared cache (e.g. LocMem across several
+workers). settings.OTP_STORE picks the backend.
+
+issue_for_delivery() also returns a delivery key the email task uses to
+look the code up again, so the plaintext code never travels through the
+Celery broker. CacheOTPStore keeps the code for delivery only until the
+email is sent (or the code expires).
+"""
+
+import hashlib
+import hmac
+import secrets
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+OTP_LENGTH = 6
+OTP_TTL = 10 * 60  # 10 minutes
+OTP_MAX_ATTEMPTS = 5
+
+
+class OTPError(Exception):
+    """Raised by verify(); `code` is "invalid", "expired" or "locked"."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def generate_code():
+    return "".join(secrets.choice("0123456789") for _ in range(OTP_LENGTH))
+
+
+class DatabaseOTPStore:
+    def issue(self, email):
+        return _email_otp_model().generate_otp(email).otp
+
+    def issue_for_delivery(self, email):
+        otp_obj = _email_otp_model().generate_otp(email)
+        return str(otp_obj.pk), otp_obj.otp
+
+    def delivery(self, key):
+        """(email, otp) still waiting to be sent under `key`, or None."""
+        otp_obj = _email_otp_model().objects.filter(pk=key, is_used=False).first()
+        if otp_obj is None or not otp_obj.is_valid():
+            return None
+        return otp_obj.email, otp_obj.otp
+
+    def discard_delivery(self, key):
+        pass
+
+    def verify(self, email, otp):
+        email_otp = _email_otp_model()
+        otp_obj = (
+            email_otp.objects.filter(email=email, otp=otp, is_used=False)
+            .order_by("-created_at")
+            .first()
+        )
+        if otp_obj is None:
+            raise OTPError("invalid")
+        if not otp_obj.is_valid():
+            raise OTPError("expired")
+        # Conditional update so two concurrent logins cannot both use the code.
+        if not email_otp.objects.filter(pk=otp_obj.pk, is_used=False).update(is_used=True):
+            raise OTPError("invalid")
+
+
+class CacheOTPStore:
+    def _digest(self, email, otp):
+        return hmac.new(
+            settings.SECRET_KEY.encode(), f"{email}:{otp}".encode(), hashlib.sha256
+        ).hexdigest()
+
+    def _keys(self, email):
+        email_hash = hashlib.sha256(email.encode()).hexdigest()[:32]
+        return f"otp:{email_hash}", f"otp:{email_hash}:attempts"
+
+    def issue(self, email):
+        otp = generate_code()
+        code_key, attempts_key = self._keys(email)
+        cache.set_many({code_key: self._digest(email, otp), attempts_key: 0}, timeout=OTP_TTL)
+        return otp
+
+    def _delivery_key(self, key):
+        return f"otp:delivery:{key}"
+
+    def issue_for_delivery(self, email):
+        otp = self.issue(email)
+        key = secrets.token_urlsafe(16)
+        cache.set(self._delivery_key(key), (email, otp), timeout=OTP_TTL)
+        return key, otp
+
+    def delivery(self, key):
+        pending = cache.get(self._delivery_key(key))
+        return tuple(pending) if pending else None
+
+    def discard_delivery(self, key):
+        cache.delete(self._delivery_key(key))
+
+    def verify(self, email, otp):
+        code_key, attempts_key = self._keys(email)
+        cache.add(attempts_key, 0, timeout=OTP_TTL)
+        try:
+            attempts = cache.incr(attempts_key)
+        except ValueError:
+            attempts = 1
+
+        if attempts > OTP_MAX_ATTEMPTS:
+            cache.delete(code_key)
+            raise OTPError("locked")
+
+        digest = cache.get(code_key)
+        if digest is None:
+            raise OTPError("expired")
+        if not hmac.compare_digest(digest, self._digest(email, otp)):
+            raise OTPError("invalid")
+        # Only the request that actually removes the key gets to log in.
+        if not cache.delete(code_key):
+            raise OTPError("expired")
+        cache.delete(attempts_key)
+
+
+def _email_otp_model():
+    return apps.get_model("users", "EmailOTP")
+
+
+def get_otp_store():
+    return import_string(getattr(settings, "OTP_STORE", "users.otp.DatabaseOTPStore"))()
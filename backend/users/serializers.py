@@ -167,45 +167,36 @@ class VerifyOTPSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
     otp = serializers.CharField(required=True, max_length=6, min_length=6)
 
+    OTP_ERRORS = {
+        "invalid": "Invalid code. Please check and try again.",
+        "expired": "This code has expired. Please request a new one.",
+        "locked": "Too many attempts. Please request a new code.",
+    }
+
     def validate(self, attrs):
         """Validate OTP"""
-        from .models import EmailOTP
-        
+        from .otp import OTPError, get_otp_store
+
         email = attrs.get('email', '').lower()
         otp = attrs.get('otp')
 
         try:
-            otp_obj = EmailOTP.objects.filter(
-                email=email,
-                otp=otp,
-                is_used=False
-            ).latest('created_at')
-            
-            if not otp_obj.is_valid():
-                raise serializers.ValidationError({
-                    "otp": "This code has expired. Please request a new one."
-                })
-            
-            try:
-                user = CustomUser.objects.get(email=email)
-            except CustomUser.DoesNotExist:
-                raise serializers.ValidationError({
-                    "email": "No account found with this email."
-                })
-            
-            otp_obj.is_used = True
-            otp_obj.save()
+            get_otp_store().verify(email, otp)
+        except OTPError as e:
+            raise serializers.ValidationError({"otp": self.OTP_ERRORS[e.code]})
 
-            raise_if_user_deactivated(user)
-            
-            attrs['user'] = user
-            return attrs
-            
-        except EmailOTP.DoesNotExist:
+        try:
+            user = CustomUser.objects.get(email=email)
+        except CustomUser.DoesNotExist:
             raise serializers.ValidationError({
-                "otp": "Invalid code. Please check and try again."
+                "email": "No account found with this email."
             })
 
+        raise_if_user_deactivated(user)
+
+        attrs['user'] = user
+        return attrs
+
 
 class GoogleAuthSerializer(serializers.Serializer):
     """Serializer for Google OAuth authentication"""
@@ -213,34 +204,12 @@ class GoogleAuthSerializer(serializers.Serializer):
     
     def validate_token(self, value):
         """Validate Google OAuth token from web or iOS app"""
-        from google.oauth2 import id_token
-        from google.auth.transport import requests
-        from django.conf import settings
-        
-        # Try validating with web client ID first
-        client_ids = [settings.GOOGLE_CLIENT_ID]
-        
-        # Add iOS app client ID if configured
-        if settings.GOOGLE_CLIENT_ID_APP:
-            client_ids.append(settings.GOOGLE_CLIENT_ID_APP)
-        
-        last_error = None
-        for client_id in client_ids:
-            try:
-                idinfo = id_token.verify_oauth2_token(
-                    value,
-                    requests.Request(),
-                    client_id
-                )
-                # Token validated successfully with this client ID
-                return idinfo
-                
-            except ValueError as e:
-                last_error = e
-                continue
-        
-        # If we get here, token validation failed for all client IDs
-        raise serializers.ValidationError(f"Invalid token: {str(last_error)}")
+        from .google_auth import GoogleTokenError, verify_google_id_token
+
+        try:
+            return verify_google_id_token(value)
+        except GoogleTokenError as e:
+            raise serializers.ValidationError(f"Invalid token: {str(e)}")
     
     def create_or_get_user(self, validated_data):
         """Create or get user from Google data"""
@@ -1,11 +1,22 @@
 import math
 from datetime import timedelta
+from typing import Any, NamedTuple
 
 from django.apps import apps
 from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
+from .cache import bump_identity_version
+
+INCENTIVE_REWARD_VALUE = 50
+INCENTIVE_TARGET_RESOLVED_REPORTS = 6
+INCENTIVE_TRUST_SCORE_REQUIRED = 110
+BULK_CHUNK_SIZE = 900  # stays under SQLite's bound-parameter limit
+
+def _user_model():
+    return apps.get_model("users", "CustomUser")
+
 def _trust_score_log_model():
     return apps.get_model("users", "TrustScoreLog")
 
@@ -74,10 +85,14 @@ def apply_trust_score_change(
     if applied_delta == 0:
         return user.trust_score
 
+    trust_score_log = _trust_score_log_model()
+    update_fields = ["trust_score"]
     user.trust_score = next_score
-    user.save(update_fields=["trust_score"])
+    if reason == trust_score_log.REASON_FAKE_REPORT and applied_delta < 0:
+        user.last_violation_at = timezone.now()
+        update_fields.append("last_violation_at")
+    user.save(update_fields=update_fields)
 
-    trust_score_log = _trust_score_log_model()
     trust_score_log.objects.create(
         user=user,
         delta=applied_delta,
@@ -87,6 +102,12 @@ def apply_trust_score_change(
         admin_id=admin_id,
     )
 
+    if (
+        next_score == INCENTIVE_TRUST_SCORE_REQUIRED
+        and not user.incentive_reward_granted
+    ):
+        refresh_resolution_incentive(user.pk)
+
     return user.trust_score
 
 
@@ -97,54 +118,244 @@ def deactivate_user_until(user, *, days):
     return until
 
 
+def days_since_last_violation(user, now=None):
+    if not user.last_violation_at:
+        return None
+    return ((now or timezone.now()) - user.last_violation_at).days
+
+
 @transaction.atomic
-def evaluate_resolution_incentive(user):
+def process_fake_report(user, *, delta, report=None, admin_id=None):
+    """
+    Penalise a confirmed fake report and deactivate the reporter for
+    calculate_deactivation_days() of the time since their previous
+    violation, read from CustomUser.last_violation_at rather than the log.
+    Returns the deactivation deadline, or None if no penalty applied
+    (already deactivated, or the score is already 0).
+    """
+    trust_score_log = _trust_score_log_model()
+    locked_user = _user_model().objects.select_for_update().get(pk=user.pk)
+    previous_violation_at = locked_user.last_violation_at
+    days_since = days_since_last_violation(locked_user)
+
+    apply_trust_score_change(
+        user=locked_user,
+        delta=-abs(delta),
+        reason=trust_score_log.REASON_FAKE_REPORT,
+        report=report,
+        admin_id=admin_id,
+    )
+    if locked_user.last_violation_at == previous_violation_at:
+        return None
+    return deactivate_user_until(
+        locked_user, days=calculate_deactivation_days(days_since)
+    )
+
+
+class TrustScoreAdjustment(NamedTuple):
+    user: Any  # CustomUser or user id
+    delta: int
+    reason: str
+    report: Any = None  # IssueReport, report id or None
+
+
+def _chunks(values, size=BULK_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _update_grouped(model, objects, field):
+    pks_by_value = {}
+    for obj in objects:
+        pks_by_value.setdefault(getattr(obj, field), []).append(obj.pk)
+    for value, pks in pks_by_value.items():
+        for chunk in _chunks(pks):
+            model.objects.filter(pk__in=chunk).update(**{field: value})
+
+
+@transaction.atomic
+def apply_trust_score_changes(
+    adjustments,
+    *,
+    appeal_status="not_appealed",
+    admin_id=None,
+):
     """
-    One-time reward:
-    trust_score == 110 and latest 6 reports are all resolved.
+    Bulk form of apply_trust_score_change for moderation batches.
+
+    `adjustments` are (user, delta, reason, report) tuples, applied in order
+    with the same clamping as the single path, and penalties are skipped
+    while a user is deactivated. Affected users are locked up front, scores
+    are written with one UPDATE per distinct new value and logs with
+    bulk_create.
+    A FAKE_REPORT penalty also deactivates the user for
+    calculate_deactivation_days() of the time since their last_violation_at.
+    Returns {user_id: trust_score} for users whose score changed.
+    """
+    user_model = _user_model()
+    trust_score_log = _trust_score_log_model()
+    adjustments = [TrustScoreAdjustment(*item) for item in adjustments]
+    user_ids = sorted({getattr(item.user, "pk", item.user) for item in adjustments})
+
+    users = {}
+    for chunk in _chunks(user_ids):
+        users.update(
+            (user.pk, user)
+            for user in user_model.objects.select_for_update()
+            .filter(pk__in=chunk)
+            .only(
+                "trust_score",
+                "deactivated_until",
+                "incentive_reward_granted",
+                "incentive_latest_resolved_count",
+                "last_violation_at",
+            )
+            .order_by("pk")
+        )
+    missing = set(user_ids) - users.keys()
+    if missing:
+        raise user_model.DoesNotExist(f"Unknown user ids: {sorted(missing)}")
+
+    now = timezone.now()
+    changed = {}
+    deactivated = {}
+    logs = []
+    for item in adjustments:
+        user = users[getattr(item.user, "pk", item.user)]
+        if item.delta < 0 and user.deactivated_until and user.deactivated_until > now:
+            continue
+
+        next_score = max(0, min(110, user.trust_score + item.delta))
+        applied_delta = next_score - user.trust_score
+        if applied_delta == 0:
+            continue
+
+        user.trust_score = next_score
+        changed[user.pk] = user
+        logs.append(
+            trust_score_log(
+                user_id=user.pk,
+                delta=applied_delta,
+                reason=item.reason,
+                report_id=getattr(item.report, "pk", item.report),
+                appeal_status=appeal_status,
+                admin_id=admin_id,
+            )
+        )
+
+        if item.reason == trust_score_log.REASON_FAKE_REPORT and applied_delta < 0:
+            days_since = days_since_last_violation(user, now)
+            user.deactivated_until = now + timedelta(
+                days=calculate_deactivation_days(days_since)
+            )
+            user.last_violation_at = now
+            deactivated[user.pk] = user
+
+    # Scores are clamped to 0..110 and deactivations share `now`, so there
+    # are few distinct new values; one UPDATE per value is far cheaper than
+    # bulk_update's per-row CASE expression.
+    _update_grouped(user_model, changed.values(), "trust_score")
+    _update_grouped(user_model, deactivated.values(), "deactivated_until")
+    _update_grouped(user_model, deactivated.values(), "last_violation_at")
+    trust_score_log.objects.bulk_create(logs, batch_size=BULK_CHUNK_SIZE)
+
+    # update() fires no signals, so invalidate cached identities here,
+    # and again on commit like users.signals does.
+    for user_id in changed:
+        bump_identity_version(user_id)
+    transaction.on_commit(lambda: [bump_identity_version(user_id) for user_id in changed])
+
+    for user in changed.values():
+        if (
+            user.trust_score == INCENTIVE_TRUST_SCORE_REQUIRED
+            and not user.incentive_reward_granted
+            and user.incentive_latest_resolved_count == INCENTIVE_TARGET_RESOLVED_REPORTS
+        ):
+            refresh_resolution_incentive(user.pk)
+
+    return {user_id: user.trust_score for user_id, user in changed.items()}
+
+
+@transaction.atomic
+def refresh_resolution_incentive(user_id):
+    """
+    Recompute the stored incentive progress and grant the one-time reward
+    (trust_score == 110 and latest 6 reports all resolved) once reached.
+    Called when a user's report is created, changes status or is deleted,
+    and when their trust score reaches 110.
     """
     issue_report = _issue_report_model()
-    locked_user = user.__class__.objects.select_for_update().get(pk=user.pk)
+    locked_user = _user_model().objects.select_for_update().filter(pk=user_id).first()
+    if locked_user is None:
+        return None
 
     latest_statuses = list(
         issue_report.objects.filter(user=locked_user)
         .order_by("-issue_date")
-        .values_list("status", flat=True)[:6]
-    )
-    has_six_reports = len(latest_statuses) == 6
-    all_latest_six_resolved = has_six_reports and all(
-        status == "resolved" for status in latest_statuses
+        .values_list("status", flat=True)[:INCENTIVE_TARGET_RESOLVED_REPORTS]
     )
-    is_eligible_now = (
-        locked_user.trust_score == 110
-        and all_latest_six_resolved
+    resolved_count = sum(1 for status in latest_statuses if status == "resolved")
+
+    update_fields = []
+    if locked_user.incentive_latest_reports_checked != len(latest_statuses):
+        locked_user.incentive_latest_reports_checked = len(latest_statuses)
+        update_fields.append("incentive_latest_reports_checked")
+    if locked_user.incentive_latest_resolved_count != resolved_count:
+        locked_user.incentive_latest_resolved_count = resolved_count
+        update_fields.append("incentive_latest_resolved_count")
+
+    if (
+        locked_user.trust_score == INCENTIVE_TRUST_SCORE_REQUIRED
+        and resolved_count == INCENTIVE_TARGET_RESOLVED_REPORTS
         and not locked_user.incentive_reward_granted
-    )
+    ):
+        locked_user.incentive_reward_granted = True
+        locked_user.incentive_reward_amount += INCENTIVE_REWARD_VALUE
+        locked_user.incentive_reward_notified = False
+        update_fields += [
+            "incentive_reward_granted",
+            "incentive_reward_amount",
+            "incentive_reward_notified",
+        ]
+
+    if update_fields:
+        locked_user.save(update_fields=update_fields)
+    return locked_user
+
 
+def evaluate_resolution_incentive(user):
+    """
+    Incentive fields for the profile response, read from the values stored
+    by refresh_resolution_incentive. Takes no locks; the only write is the
+    one-time flip of incentive_reward_notified after a grant.
+    """
     reward_just_granted = False
-    if is_eligible_now:
-        locked_user.incentive_reward_granted = True
-        locked_user.incentive_reward_amount += 50
-        locked_user.save(
-            update_fields=[
-                "incentive_reward_granted",
-                "incentive_reward_amount",
-            ]
+    if user.incentive_reward_granted and not user.incentive_reward_notified:
+        # Conditional update, so only one concurrent request reports the grant.
+        reward_just_granted = bool(
+            _user_model()
+            .objects.filter(pk=user.pk, incentive_reward_notified=False)
+            .update(incentive_reward_notified=True)
         )
-        reward_just_granted = True
+        if reward_just_granted:
+            bump_identity_version(user.pk)
 
+    all_latest_six_resolved = (
+        user.incentive_latest_resolved_count == INCENTIVE_TARGET_RESOLVED_REPORTS
+    )
     return {
-        "incentive_reward_granted": locked_user.incentive_reward_granted,
-        "incentive_reward_amount": locked_user.incentive_reward_amount,
-        "incentive_reward_value": 50,
-        "incentive_target_resolved_reports": 6,
-        "incentive_latest_reports_checked": len(latest_statuses),
-        "incentive_latest_resolved_count": sum(
-            1 for status in latest_statuses if status == "resolved"
-        ),
+        "incentive_reward_granted": user.incentive_reward_granted,
+        "incentive_reward_amount": user.incentive_reward_amount,
+        "incentive_reward_value": INCENTIVE_REWARD_VALUE,
+        "incentive_target_resolved_reports": INCENTIVE_TARGET_RESOLVED_REPORTS,
+        "incentive_latest_reports_checked": user.incentive_latest_reports_checked,
+        "incentive_latest_resolved_count": user.incentive_latest_resolved_count,
         "incentive_all_latest_reports_resolved": all_latest_six_resolved,
-        "incentive_trust_score_required": 110,
-        "incentive_has_required_trust_score": locked_user.trust_score == 110,
-        "incentive_is_eligible_now": is_eligible_now,
+        "incentive_trust_score_required": INCENTIVE_TRUST_SCORE_REQUIRED,
+        "incentive_has_required_trust_score": (
+            user.trust_score == INCENTIVE_TRUST_SCORE_REQUIRED
+        ),
+        "incentive_is_eligible_now": reward_just_granted,
         "incentive_reward_just_granted": reward_just_granted,
     }
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from user_profile.models import UserProfile
+
+from .blacklist import record_blacklisted
+from .cache import bump_identity_version
+from .models import CustomUser
+
+
+def _invalidate(user_id):
+    bump_identity_version(user_id)
+    # Bump again once committed, in case a request cached the old row
+    # between the save and the commit.
+    transaction.on_commit(lambda: bump_identity_version(user_id))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    _invalidate(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    _invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def remember_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        record_blacklisted(instance.token.jti)
@@ -0,0 +1,97 @@
+"""
+Background email delivery.
+
+Each worker process keeps one SMTP connection open and reuses it for every
+message, so a send costs one SMTP transaction instead of a fresh TCP + TLS
+handshake and login. A connection the server has dropped is reopened once
+in place; other failures are retried with exponential backoff. Tasks run
+eagerly (no broker) are not retried: the failure propagates to the caller.
+"""
+
+import smtplib
+import threading
+
+from celery import shared_task
+from django.core.mail import get_connection
+
+from .blacklist import prune_expired_tokens
+from .email_utils import build_email, build_otp_email
+from .otp import get_otp_store
+
+EMAIL_MAX_RETRIES = 5
+EMAIL_RETRY_BACKOFF_MAX = 60
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def get_smtp_connection():
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            _connection = connection
+        return _connection
+
+
+def close_smtp_connection():
+    global _connection
+    with _connection_lock:
+        connection, _connection = _connection, None
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def send_with_shared_connection(message):
+    try:
+        message.connection = get_smtp_connection()
+        return message.send(fail_silently=False)
+    except smtplib.SMTPServerDisconnected:
+        # Idle connections get dropped by the server; reconnect once.
+        close_smtp_connection()
+        message.connection = get_smtp_connection()
+        return message.send(fail_silently=False)
+
+
+def runs_eagerly():
+    """True when tasks execute in the calling process instead of a worker."""
+    return send_otp_email_task.app.conf.task_always_eager
+
+
+def _deliver(task, message):
+    try:
+        send_with_shared_connection(message)
+    except (smtplib.SMTPException, OSError) as e:
+        print(f"Failed to send {message.subject!r} email: {e}")
+        close_smtp_connection()
+        if task.request.is_eager:
+            raise
+        countdown = min(2 ** task.request.retries, EMAIL_RETRY_BACKOFF_MAX)
+        raise task.retry(exc=e, countdown=countdown)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=EMAIL_MAX_RETRIES)
+def send_otp_email_task(self, delivery_key):
+    """Send the code issued under `delivery_key`; the code stays out of the broker."""
+    store = get_otp_store()
+    pending = store.delivery(delivery_key)
+    if pending is None:
+        return  # Expired or already used.
+    _deliver(self, build_otp_email(*pending))
+    store.discard_delivery(delivery_key)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=EMAIL_MAX_RETRIES)
+def send_email_task(self, name, email, context):
+    """Send any registered transactional email, e.g. "report_status"."""
+    _deliver(self, build_email(name, email, context))
+
+
+@shared_task(ignore_result=True)
+def prune_expired_tokens_task():
+    deleted = prune_expired_tokens()
+    print(f"Pruned {deleted} expired outstanding tokens")
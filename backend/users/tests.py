@@ -1,3 +1,737 @@
-from django.test import TestCase
+import json
+import os
+import smtplib
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import rsa
+from google.auth import crypt, jwt
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from report.models import IssueReport
+from report_hub.celery import app as celery_app
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from user_profile.models import UserProfile
+from users import blacklist, email_utils, google_auth, otp, tasks
+from users.cache import get_cached_user, get_user_profile
+from users.models import CustomUser, EmailOTP, TrustScoreLog
+from users.services import (
+    apply_trust_score_change,
+    apply_trust_score_changes,
+    calculate_deactivation_days,
+    deactivate_user_until,
+    process_fake_report,
+    refresh_resolution_incentive,
+)
+
+
+class EmailTemplateRegistryTests(SimpleTestCase):
+    def test_templates_are_compiled_once(self):
+        registry = email_utils.EmailTemplateRegistry()
+        with mock.patch.object(registry, "_read", wraps=registry._read) as read:
+            registry.render("otp", {"email": "a@example.com", "otp": "123456"})
+            registry.render("otp", {"email": "b@example.com", "otp": "654321"})
+        self.assertEqual(read.call_count, 3)
+
+    def test_otp_email(self):
+        message = email_utils.build_otp_email("a@example.com", "123456")
+        html_message = message.alternatives[0][0]
+
+        self.assertEqual(message.subject, "ReportMitra Login OTP")
+        self.assertIn("│      123456       │", message.body)
+        self.assertIn("<title>ReportMitra - Login OTP</title>", html_message)
+        self.assertIn("123456", html_message)
+        self.assertNotIn("{{", html_message)
+
+    def test_html_slots_are_escaped(self):
+        subject, text, html_message = email_utils.registry.render("report_status", {
+            "email": "a@example.com",
+            "tracking_id": "AB12CD34",
+            "issue_title": "<b>Pothole</b>",
+            "status": "Resolved",
+        })
+
+        self.assertEqual(subject, "Your report AB12CD34 is now Resolved")
+        self.assertIn("<b>Pothole</b>", text)
+        self.assertIn("&lt;b&gt;Pothole&lt;/b&gt;", html_message)
+
+    def test_literals_are_kept_verbatim(self):
+        source = 'p { color: "#fff"; } \\n {x} \'{{ slot }}\' {{ slot }}'
+        template = email_utils.CompiledTemplate(source, autoescape=True)
+
+        self.assertEqual(
+            template.render({"slot": "<i>"}),
+            'p { color: "#fff"; } \\n {x} \'&lt;i&gt;\' &lt;i&gt;',
+        )
+
+    def test_unsupported_markup_is_rejected(self):
+        for source in ("{{ until|date }}", "{% if otp %}x{% endif %}", "{# note #}"):
+            with self.subTest(source=source), self.assertRaises(ValueError):
+                email_utils.CompiledTemplate(source)
+
+    def test_shipped_templates_compile(self):
+        registry = email_utils.EmailTemplateRegistry()
+        for name in email_utils.EMAILS:
+            registry.get(name)
+
+
+@override_settings(OTP_STORE="users.otp.CacheOTPStore")
+class OTPEmailTaskTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        tasks.close_smtp_connection()
+        self.addCleanup(tasks.close_smtp_connection)
+
+    def issue(self, email):
+        return otp.get_otp_store().issue_for_delivery(email)
+
+    def test_worker_reuses_one_connection(self):
+        (key_a, code_a), (key_b, _) = self.issue("a@example.com"), self.issue("b@example.com")
+        with mock.patch("users.tasks.get_connection", wraps=tasks.get_connection) as get_connection:
+            tasks.send_otp_email_task.apply(args=[key_a])
+            tasks.send_otp_email_task.apply(args=[key_b])
+
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual([message.to for message in mail.outbox], [["a@example.com"], ["b@example.com"]])
+        self.assertIn(code_a, mail.outbox[0].body)
+
+    def test_code_is_read_from_store_and_not_resent(self):
+        key, _ = self.issue("a@example.com")
+
+        tasks.send_otp_email_task.apply(args=[key])
+        tasks.send_otp_email_task.apply(args=[key])
+        tasks.send_otp_email_task.apply(args=["unknown"])
+
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_dropped_connection_is_reopened(self):
+        stale = mock.Mock()
+        stale.send_messages.side_effect = smtplib.SMTPServerDisconnected("idle")
+        fresh = mock.Mock()
+        fresh.send_messages.return_value = 1
+        key, _ = self.issue("a@example.com")
+
+        with mock.patch("users.tasks.get_connection", side_effect=[stale, fresh]):
+            result = tasks.send_otp_email_task.apply(args=[key])
+
+        self.assertTrue(result.successful())
+        stale.close.assert_called_once()
+        fresh.send_messages.assert_called_once()
+
+    def test_smtp_errors_are_retried_with_backoff_on_workers(self):
+        task = mock.Mock()
+        task.request.is_eager = False
+        task.request.retries = 3
+        task.retry.side_effect = RuntimeError("retry")
+        error = smtplib.SMTPDataError(451, "try later")
+
+        with mock.patch("users.tasks.send_with_shared_connection", side_effect=error):
+            with self.assertRaisesMessage(RuntimeError, "retry"):
+                tasks._deliver(task, mock.Mock(subject="OTP"))
+
+        task.retry.assert_called_once_with(exc=error, countdown=8)
+
+    def test_eager_failures_propagate_without_retry(self):
+        key, _ = self.issue("a@example.com")
+        with mock.patch(
+            "users.tasks.send_with_shared_connection",
+            side_effect=smtplib.SMTPDataError(451, "try later"),
+        ) as send:
+            with self.assertRaises(smtplib.SMTPDataError):
+                tasks.send_otp_email_task.apply(args=[key])
+
+        self.assertEqual(send.call_count, 1)
+
+    def test_generic_email_task(self):
+        tasks.send_email_task.apply(
+            args=["deactivation", "a@example.com", {"days": 7, "until": "01 Jan 2026"}]
+        )
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("deactivated for\n7 days", mail.outbox[0].body)
+
+
+class RequestOTPViewTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(email="user@example.com", password="pass12345")
+        tasks.close_smtp_connection()
+        self.addCleanup(tasks.close_smtp_connection)
+
+    def test_request_otp_queues_email(self):
+        with mock.patch.object(tasks.send_otp_email_task, "delay") as delay:
+            response = APIClient().post("/api/users/request-otp/", {"email": "user@example.com"})
+
+        self.assertEqual(response.status_code, 200)
+        otp_obj = EmailOTP.objects.get(email="user@example.com")
+        delay.assert_called_once_with(str(otp_obj.pk))
+        self.assertNotIn(otp_obj.otp, str(delay.call_args))
+        self.assertEqual(mail.outbox, [])
+
+    def test_eager_mode_delivers_inline(self):
+        self.assertTrue(celery_app.conf.task_always_eager)
+        response = APIClient().post("/api/users/request-otp/", {"email": "user@example.com"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(EmailOTP.objects.get(email="user@example.com").otp, mail.outbox[0].body)
+
+    def test_eager_send_failure_returns_500(self):
+        with mock.patch(
+            "users.tasks.send_with_shared_connection",
+            side_effect=smtplib.SMTPDataError(451, "try later"),
+        ) as send:
+            response = APIClient().post("/api/users/request-otp/", {"email": "user@example.com"})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(send.call_count, 1)
+
+    def test_falls_back_to_inline_send_when_broker_is_down(self):
+        with mock.patch("users.views.runs_eagerly", return_value=False), mock.patch.object(
+            tasks.send_otp_email_task, "delay", side_effect=ConnectionError("broker down")
+        ):
+            response = APIClient().post("/api/users/request-otp/", {"email": "user@example.com"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class CacheOTPStoreTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = otp.CacheOTPStore()
+
+    def test_code_is_stored_hashed_and_single_use(self):
+        code = self.store.issue("a@example.com")
+
+        self.assertNotIn(code, str(cache.get(self.store._keys("a@example.com")[0])))
+        self.store.verify("a@example.com", code)
+        with self.assertRaisesMessage(otp.OTPError, "expired"):
+            self.store.verify("a@example.com", code)
+
+    def test_reissue_replaces_previous_code(self):
+        with mock.patch("users.otp.generate_code", side_effect=["111111", "222222"]):
+            self.store.issue("a@example.com")
+            self.store.issue("a@example.com")
+
+        with self.assertRaisesMessage(otp.OTPError, "invalid"):
+            self.store.verify("a@example.com", "111111")
+        self.store.verify("a@example.com", "222222")
+
+    def test_attempts_are_limited(self):
+        code = self.store.issue("a@example.com")
+        wrong = "000000" if code != "000000" else "111111"
+        for _ in range(otp.OTP_MAX_ATTEMPTS):
+            with self.assertRaisesMessage(otp.OTPError, "invalid"):
+                self.store.verify("a@example.com", wrong)
+
+        with self.assertRaisesMessage(otp.OTPError, "locked"):
+            self.store.verify("a@example.com", code)
+
+
+class VerifyOTPViewTests(TestCase):
+    url = "/api/users/verify-otp/"
+
+    def setUp(self):
+        cache.clear()
+        CustomUser.objects.create_user(email="user@example.com", password="pass12345")
+
+    def login(self, code):
+        return APIClient().post(self.url, {"email": "user@example.com", "otp": code})
+
+    @override_settings(OTP_STORE="users.otp.CacheOTPStore")
+    def test_cache_store_login_writes_no_otp_rows(self):
+        code = otp.get_otp_store().issue("user@example.com")
+
+        self.assertEqual(self.login(code).status_code, 200)
+        self.assertEqual(self.login(code).status_code, 400)
+        self.assertFalse(EmailOTP.objects.exists())
+
+    @override_settings(OTP_STORE="users.otp.DatabaseOTPStore")
+    def test_database_store_fallback(self):
+        code = otp.get_otp_store().issue("user@example.com")
+
+        self.assertEqual(self.login(code).status_code, 200)
+        response = self.login(code)
+        self.assertEqual(response.data["otp"], ["Invalid code. Please check and try again."])
+        self.assertTrue(EmailOTP.objects.get(email="user@example.com").is_used)
+
+
+@override_settings(GOOGLE_CLIENT_ID="web-client", GOOGLE_CLIENT_ID_APP="ios-client")
+class GoogleAuthTests(TestCase):
+    url = "/api/users/google-auth/"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        public_key, private_key = rsa.newkeys(1024)
+        cls.signer = crypt.RSASigner.from_string(private_key.save_pkcs1(), key_id="k1")
+        cls.public_pem = public_key.save_pkcs1().decode()
+
+    def setUp(self):
+        cache.clear()
+        google_auth.certs.clear()
+        google_auth.verified_tokens.clear()
+        self.response = mock.Mock(headers={"Cache-Control": "public, max-age=3600", "Age": "100"})
+        self.response.json.return_value = {"k1": self.public_pem}
+        patcher = mock.patch.object(google_auth.certs._session, "get", return_value=self.response)
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def token(self, email="g@example.com", aud="ios-client", signer=None):
+        now = int(time.time())
+        return jwt.encode(signer or self.signer, {
+            "iss": "https://accounts.google.com",
+            "aud": aud,
+            "sub": f"sub-{email}",
+            "email": email,
+            "iat": now,
+            "exp": now + 3600,
+        }).decode()
+
+    def test_sign_in_fetches_certificates_once(self):
+        first = APIClient().post(self.url, {"token": self.token("a@example.com")})
+        second = APIClient().post(self.url, {"token": self.token("b@example.com", aud="web-client")})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertTrue(CustomUser.objects.filter(email="b@example.com", auth_method="google").exists())
+
+    def test_verified_tokens_are_memoized(self):
+        token = self.token()
+        with mock.patch("users.google_auth.jwt.decode", wraps=jwt.decode) as decode:
+            google_auth.verify_google_id_token(token)
+            claims = google_auth.verify_google_id_token(token)
+
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(claims["email"], "g@example.com")
+
+    def test_cache_control_is_honored(self):
+        self.response.headers = {"Cache-Control": "max-age=100", "Age": "100"}
+        google_auth.verify_google_id_token(self.token("a@example.com"))
+        google_auth.verify_google_id_token(self.token("b@example.com"))
+
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_unknown_key_id_triggers_refetch(self):
+        google_auth.verify_google_id_token(self.token("a@example.com"))
+        public_key, private_key = rsa.newkeys(1024)
+        rotated = crypt.RSASigner.from_string(private_key.save_pkcs1(), key_id="k2")
+        self.response.json.return_value = {"k2": public_key.save_pkcs1().decode()}
+        google_auth.certs._fetched_at -= google_auth.MIN_REFETCH_INTERVAL
+
+        claims = google_auth.verify_google_id_token(self.token("b@example.com", signer=rotated))
+
+        self.assertEqual(claims["email"], "b@example.com")
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_rejects_unknown_audience(self):
+        response = APIClient().post(self.url, {"token": self.token(aud="someone-else")})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid token", str(response.data["token"]))
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=300)
+class CachedJWTAuthenticationTests(TestCase):
+    url = "/api/users/me/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="user@example.com", password="pass12345")
+        UserProfile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def me(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_warm_requests_resolve_identity_without_queries(self):
+        self.me()
+        with self.assertNumQueries(0):
+            self.me()
+            profile = get_user_profile(get_cached_user(self.user.pk))
+        self.assertEqual(profile.user_id, self.user.pk)
+
+    def test_trust_score_change_invalidates(self):
+        self.assertEqual(self.me()["trust_score"], 100)
+
+        apply_trust_score_change(user=self.user, delta=-20, reason=TrustScoreLog.REASON_FAKE_REPORT)
+
+        self.assertEqual(self.me()["trust_score"], 80)
+
+    def test_deactivation_invalidates(self):
+        self.assertFalse(self.me()["is_temporarily_deactivated"])
+
+        deactivate_user_until(self.user, days=3)
+
+        self.assertTrue(self.me()["is_temporarily_deactivated"])
+
+    def test_profile_save_invalidates(self):
+        self.me()
+        profile = UserProfile.objects.get(user=self.user)
+        profile.is_aadhaar_verified = True
+        profile.save()
+
+        self.assertTrue(get_user_profile(get_cached_user(self.user.pk)).is_aadhaar_verified)
+
+    def test_inactive_or_deleted_user_is_rejected(self):
+        self.me()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        self.user.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+
+class PerProcessCacheIdentityTests(TestCase):
+    """Two workers with their own LocMem caches, as without REDIS_URL."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="user@example.com", password="pass12345")
+        self.worker_a = LocMemCache("worker-a", {})
+        self.worker_b = LocMemCache("worker-b", {})
+
+    def in_worker(self, worker_cache, func):
+        with mock.patch("users.cache.cache", worker_cache):
+            return func()
+
+    def ban_in_worker_b(self):
+        self.in_worker(self.worker_b, lambda: deactivate_user_until(self.user, days=3))
+
+    def test_ban_from_another_worker_is_seen_immediately(self):
+        self.assertFalse(
+            self.in_worker(self.worker_a, lambda: get_cached_user(self.user.pk)).is_temporarily_deactivated
+        )
+        self.ban_in_worker_b()
+
+        user = self.in_worker(self.worker_a, lambda: get_cached_user(self.user.pk))
+        self.assertTrue(user.is_temporarily_deactivated)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=300)
+    def test_per_process_cache_would_miss_the_ban(self):
+        # Why the cache is off without a shared backend.
+        self.in_worker(self.worker_a, lambda: get_cached_user(self.user.pk))
+        self.ban_in_worker_b()
+
+        user = self.in_worker(self.worker_a, lambda: get_cached_user(self.user.pk))
+        self.assertFalse(user.is_temporarily_deactivated)
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = blacklist.BloomFilter(10_000, error_rate=0.001)
+        for i in range(10_000):
+            bloom.add(f"in-{i}")
+
+        self.assertTrue(all(f"in-{i}" in bloom for i in range(10_000)))
+        false_positives = sum(f"out-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 50)
+
+
+@override_settings(JWT_BLACKLIST_BLOOM_ENABLED=True)
+class TokenBlacklistTests(TestCase):
+    url = "/api/users/token/refresh/"
+
+    def setUp(self):
+        cache.clear()
+        blacklist.blacklist_filter.invalidate()
+        self.user = CustomUser.objects.create_user(email="user@example.com", password="pass12345")
+        self.client = APIClient()
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def refresh_token(self, token):
+        return self.client.post(self.url, {"refresh": token}, format="json")
+
+    def test_unblacklisted_token_checks_without_query(self):
+        blacklist.blacklist_filter.get()
+        jti = RefreshToken(self.refresh)["jti"]
+        with self.assertNumQueries(0):
+            self.assertFalse(blacklist.is_blacklisted(jti))
+
+    def test_logged_out_token_is_rejected(self):
+        blacklist.blacklist_filter.get()
+        self.client.force_authenticate(self.user)
+        self.client.post("/api/users/logout/", {"refresh": self.refresh}, format="json")
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.refresh_token(self.refresh).status_code, 401)
+
+        # A fresh filter built from the database still knows about it.
+        blacklist.blacklist_filter.invalidate()
+        cache.clear()
+        self.assertEqual(self.refresh_token(self.refresh).status_code, 401)
+
+    def test_rotated_token_cannot_be_reused(self):
+        response = self.refresh_token(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data["refresh"], self.refresh)
+
+        self.assertEqual(self.refresh_token(self.refresh).status_code, 401)
+        self.assertEqual(self.refresh_token(response.data["refresh"]).status_code, 200)
+
+    def test_prune_deletes_only_expired_tokens(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        OutstandingToken.objects.filter(jti=token["jti"]).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+        live = RefreshToken(self.refresh)
+        live.blacklist()
+
+        call_command("prune_outstanding_tokens", "--batch-size", "1", stdout=mock.Mock())
+
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", flat=True)), [live["jti"]]
+        )
+
+
+class ResolutionIncentiveTests(TestCase):
+    url = "/api/profile/me/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="user@example.com", password="pass12345")
+        UserProfile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def create_reports(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [
+                IssueReport.objects.create(
+                    user=self.user,
+                    location="MG Road",
+                    issue_description="Pothole",
+                    tracking_id=f"TRK{i:05d}",
+                )
+                for i in range(count)
+            ]
+
+    def resolve(self, report):
+        with self.captureOnCommitCallbacks(execute=True):
+            report.status = "resolved"
+            report.save()
+
+    def profile(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_progress_is_updated_when_reports_change(self):
+        reports = self.create_reports(6)
+        self.resolve(reports[0])
+
+        data = self.profile()
+        self.assertEqual(data["incentive_latest_reports_checked"], 6)
+        self.assertEqual(data["incentive_latest_resolved_count"], 1)
+        self.assertFalse(data["incentive_reward_granted"])
+
+    def test_profile_read_takes_no_lock_or_write(self):
+        self.create_reports(2)
+        self.profile()
+        with CaptureQueriesContext(connection) as ctx:
+            self.profile()
+        self.assertFalse(
+            [q for q in ctx.captured_queries if "FOR UPDATE" in q["sql"] or "UPDATE" in q["sql"]]
+        )
+
+    def test_reward_is_granted_once_and_reported_once(self):
+        for report in self.create_reports(6):
+            self.resolve(report)
+        apply_trust_score_change(user=self.user, delta=10, reason=TrustScoreLog.REASON_ISSUE_RESOLVED)
+
+        first = self.profile()
+        self.assertTrue(first["incentive_reward_granted"])
+        self.assertTrue(first["incentive_reward_just_granted"])
+        self.assertEqual(first["incentive_reward_amount"], 50)
+
+        second = self.profile()
+        self.assertFalse(second["incentive_reward_just_granted"])
+
+        refresh_resolution_incentive(self.user.pk)
+        self.assertEqual(self.profile()["incentive_reward_amount"], 50)
+
+
+class BulkTrustScoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            CustomUser.objects.create_user(email=f"user{n}@example.com", password="pass12345")
+            for n in range(3)
+        ]
+
+    def test_matches_single_path_clamping_and_logs(self):
+        first, second, third = self.users
+        scores = apply_trust_score_changes(
+            [
+                (first, 20, TrustScoreLog.REASON_ISSUE_RESOLVED, None),
+                (second.pk, -30, TrustScoreLog.REASON_MANUAL_ADMIN_ADJUSTMENT, None),
+                (second.pk, -80, TrustScoreLog.REASON_MANUAL_ADMIN_ADJUSTMENT, None),
+                (third, 0, TrustScoreLog.REASON_MANUAL_ADMIN_ADJUSTMENT, None),
+            ],
+            admin_id=7,
+        )
+
+        self.assertEqual(scores, {first.pk: 110, second.pk: 0})
+        self.assertEqual(
+            sorted(TrustScoreLog.objects.values_list("user_id", "delta", "admin_id")),
+            sorted([(first.pk, 10, 7), (second.pk, -30, 7), (second.pk, -70, 7)]),
+        )
+        third.refresh_from_db()
+        self.assertEqual(third.trust_score, 100)
+
+    def test_fake_report_deactivates_and_blocks_further_penalties(self):
+        user = self.users[0]
+        apply_trust_score_changes(
+            [
+                (user, -10, TrustScoreLog.REASON_FAKE_REPORT, None),
+                (user, -10, TrustScoreLog.REASON_FAKE_REPORT, None),
+                (user, 5, TrustScoreLog.REASON_APPEAL_ACCEPTED, None),
+            ]
+        )
+
+        user.refresh_from_db()
+        self.assertEqual(user.trust_score, 95)
+        self.assertTrue(user.is_temporarily_deactivated)
+        days = (user.deactivated_until - timezone.now()).days + 1
+        self.assertEqual(days, calculate_deactivation_days(None))
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        batch = [
+            (user, delta, TrustScoreLog.REASON_MANUAL_ADMIN_ADJUSTMENT, None)
+            for user in self.users
+            for delta in (-1, -1, 1) * 20
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            apply_trust_score_changes(batch)
+
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+        self.assertEqual(TrustScoreLog.objects.count(), len(batch))
+
+    def test_invalidates_cached_identity(self):
+        user = self.users[0]
+        get_cached_user(user.pk)
+
+        apply_trust_score_changes([(user, -15, TrustScoreLog.REASON_MANUAL_ADMIN_ADJUSTMENT, None)])
+
+        self.assertEqual(get_cached_user(user.pk).trust_score, 85)
+
+
+class ReplayTrustScoresTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            CustomUser.objects.create_user(email=f"user{n}@example.com", password="pass12345")
+            for n in range(5)
+        ]
+        for user in self.users:
+            apply_trust_score_change(user=user, delta=-30, reason=TrustScoreLog.REASON_FAKE_REPORT)
+            apply_trust_score_change(user=user, delta=5, reason=TrustScoreLog.REASON_APPEAL_ACCEPTED)
+        # Drift two users: one with a ledger, one never logged.
+        CustomUser.objects.filter(pk=self.users[1].pk).update(trust_score=42)
+        self.untracked = CustomUser.objects.create_user(email="new@example.com", password="pass12345")
+        CustomUser.objects.filter(pk=self.untracked.pk).update(trust_score=90)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("replay_trust_scores", "--batch-size", "2", "--chunk-size", "3", *args, stdout=out)
+        return out.getvalue()
+
+    def scores(self):
+        return dict(CustomUser.objects.values_list("pk", "trust_score"))
+
+    def test_verify_reports_without_writing(self):
+        before = self.scores()
+        output = self.run_command()
+
+        self.assertIn(f"user {self.users[1].pk}: stored=42 ledger=75", output)
+        self.assertIn(f"user {self.untracked.pk}: stored=90 ledger=100", output)
+        self.assertIn("Checked 6 users, 2 mismatched", output)
+        self.assertEqual(self.scores(), before)
+
+    def test_repair_writes_replayed_scores_and_invalidates_cache(self):
+        get_cached_user(self.users[1].pk)
+
+        output = self.run_command("--repair")
+
+        self.assertIn("repaired 2", output)
+        self.assertEqual(set(self.scores().values()), {75, 100})
+        self.assertEqual(get_cached_user(self.users[1].pk).trust_score, 75)
+        self.assertIn("0 mismatched", self.run_command())
+
+    def test_resume_continues_after_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "replay.json")
+            with open(path, "w") as fh:
+                json.dump({"last_user_id": self.users[2].pk, "checked": 3, "mismatched": 1, "repaired": 0}, fh)
+
+            output = self.run_command("--checkpoint", path, "--resume")
+
+            self.assertIn("Checked 6 users, 2 mismatched", output)
+            with open(path) as fh:
+                self.assertEqual(json.load(fh)["last_user_id"], self.untracked.pk)
+
+
+class FakeReportProcessingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="user@example.com", password="pass12345")
+
+    def test_penalty_records_last_violation(self):
+        apply_trust_score_change(user=self.user, delta=5, reason=TrustScoreLog.REASON_APPEAL_ACCEPTED)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_violation_at)
+
+        apply_trust_score_change(user=self.user, delta=-10, reason=TrustScoreLog.REASON_FAKE_REPORT)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_violation_at)
+
+    def test_ban_length_uses_last_violation_without_reading_logs(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(
+            last_violation_at=timezone.now() - timedelta(days=40)
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            until = process_fake_report(self.user, delta=10)
+
+        self.assertFalse(
+            [q for q in ctx.captured_queries if "SELECT" in q["sql"] and "trustscorelog" in q["sql"]]
+        )
+        days = (until - timezone.now()).days + 1
+        self.assertEqual(days, calculate_deactivation_days(40))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.trust_score, 90)
+        self.assertEqual(self.user.deactivated_until, until)
+
+    def test_deactivated_user_is_not_penalised_again(self):
+        first = process_fake_report(self.user, delta=10)
+
+        self.assertIsNone(process_fake_report(self.user, delta=10))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.trust_score, 90)
+        self.assertEqual(self.user.deactivated_until, first)
+
+    def test_bulk_path_maintains_last_violation(self):
+        apply_trust_score_changes([(self.user, -10, TrustScoreLog.REASON_FAKE_REPORT, None)])
+
+        self.user.refresh_from_db()
+        ban = timedelta(days=calculate_deactivation_days(None))
+        self.assertEqual(self.user.last_violation_at, self.user.deactivated_until - ban)
@@ -1,6 +1,5 @@
 # users/urls.py
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
 
 urlpatterns = [
@@ -8,7 +7,7 @@ urlpatterns = [
     path('register/', views.register_view, name='register'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', views.CachedTokenRefreshView.as_view(), name='token_refresh'),
     
     # OTP endpoints
     path('request-otp/', views.request_otp_view, name='request-otp'),
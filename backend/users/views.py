@@ -1,12 +1,11 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 
-from user_profile.models import UserProfile
 from user_profile.serializers import UserProfileSerializer
 from .serializers import (
     RegisterSerializer, 
@@ -18,7 +17,11 @@ from .serializers import (
     GoogleAuthSerializer
 )
 from .email_utils import send_otp_email
-from .models import EmailOTP
+from .otp import get_otp_store
+from .tasks import runs_eagerly, send_otp_email_task
+from report_hub.throttling import AuthThrottle, OTPRequestThrottle
+from .blacklist import CachedTokenRefreshSerializer, FastBlacklistRefreshToken
+from .cache import get_user_profile
 from .services import raise_if_user_deactivated
 
 @api_view(['POST'])
@@ -50,6 +53,7 @@ def register_view(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle])
 def login_view(request):
     """
     Login with email and password
@@ -91,7 +95,7 @@ def logout_view(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        token = RefreshToken(refresh_token)
+        token = FastBlacklistRefreshToken(refresh_token)
         token.blacklist()
         
         return Response({
@@ -110,6 +114,15 @@ def logout_view(request):
         )
 
 
+class CachedTokenRefreshView(TokenRefreshView):
+    """
+    Refresh an access token
+    POST /api/users/token/refresh/
+    Body: {"refresh": "refresh_token_here"}
+    """
+    serializer_class = CachedTokenRefreshSerializer
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def current_user_view(request):
@@ -128,7 +141,7 @@ def user_profile(request):
     Get or update user profile for the logged-in user
     GET/PUT /api/users/profile/
     """
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    profile = get_user_profile(request.user)
 
     if request.method == 'GET':
         serializer = UserProfileSerializer(profile)
@@ -178,6 +191,7 @@ def verify_user(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle, OTPRequestThrottle])
 def request_otp_view(request):
     """
     Request OTP for email-based login
@@ -189,8 +203,19 @@ def request_otp_view(request):
     if serializer.is_valid():
         email = serializer.validated_data['email']
         
-        otp_obj = EmailOTP.generate_otp(email)
-        email_sent = send_otp_email(email, otp_obj.otp)
+        delivery_key, otp = get_otp_store().issue_for_delivery(email)
+        try:
+            send_otp_email_task.delay(delivery_key)
+            email_sent = True
+        except Exception as e:
+            if runs_eagerly():
+                # The task ran in this request and the send itself failed.
+                print(f"Failed to send OTP email: {e}")
+                email_sent = False
+            else:
+                # Broker unavailable: fall back to sending in the request.
+                print(f"Failed to queue OTP email: {e}")
+                email_sent = send_otp_email(email, otp)
         
         if email_sent:
             return Response({
@@ -207,6 +232,7 @@ def request_otp_view(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle])
 def verify_otp_view(request):
     """
     Verify OTP and login user
@@ -233,6 +259,7 @@ def verify_otp_view(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle])
 def google_auth_view(request):
     """
     Authenticate with Google OAuth